@@ -4,13 +4,21 @@ Atlas Coder DSPy CLI
 Revolutionary systematic programming interface
 """
 
-import os
 import sys
 import argparse
 import json
 from typing import Optional
 from dspy_core.engine import get_engine, initialize_engine
 from dspy_core.workflows import get_orchestrator
+from dspy_core.cli_utils import (
+    WORKFLOW_MAP, PARAM_BUILDERS, OUTPUT_BUFFER_SIZE, icon as _icon, read_input, write_output_file
+)
+
+# Result templates for text output
+BUGFIX_TMPL = f"{_icon('🐛 ')}Bug Fix Results:\n\n{_icon('📊 ')}Diagnosis:\n{{diagnosis}}\n\n{_icon('🔧 ')}Fix:\n{{fix}}\n\n{_icon('✅ ')}Fixed Code:\n{{code}}"
+GENERATE_TMPL = f"{_icon('⚡ ')}Code Generation Results:\n\n{_icon('📝 ')}Understanding:\n{{understanding}}\n\n{_icon('💡 ')}Code:\n{{code}}\n\n{_icon('📖 ')}Explanation:\n{{explanation}}"
+ANALYSIS_TMPL = f"{_icon('🔍 ')}Code Analysis Results:\n\n{_icon('📊 ')}Analysis:\n{{analysis}}\n\n{_icon('⚠️ ')}Issues:\n{{issues}}\n\n{_icon('🏗️ ')}Architecture:\n{{architecture}}"
+REFACTOR_TMPL = f"{_icon('🔧 ')}Refactoring Results:\n\n{_icon('✨ ')}Improvements:\n{{improvements}}\n\n{_icon('🔄 ')}Refactored Code:\n{{code}}"
 
 def setup_cli():
     """Setup command line interface"""
@@ -77,81 +85,72 @@ Available workflows:
     
     return parser
 
-def read_input(input_arg: str) -> str:
-    """Read input from file or use as direct input"""
-    if not input_arg:
-        return ""
-    
-    # Check if it's a file path
-    if os.path.isfile(input_arg):
-        try:
-            with open(input_arg, 'r') as f:
-                return f.read()
-        except Exception as e:
-            print(f"⚠️ Could not read file {input_arg}: {e}")
-            return input_arg
-    
-    # Use as direct input
-    return input_arg
-
 def format_output(result, format_type: str, verbose: bool = False):
     """Format and display workflow results"""
     if not result.success:
-        print(f"❌ Error: {result.error}")
+        print(f"{_icon('❌ ')}Error: {result.error}")
         return
     
     if format_type == "json":
-        print(json.dumps(result.to_dict(), indent=2))
+        json.dump(result.to_dict(), sys.stdout, indent=2)
+        sys.stdout.write('\n')
         return
     
-    # Text format
+    # Text format - collect every section and emit them with a single write
     data = result.data
+    lines = []
     
     if "fixed_code" in data:
         # Bug fixing workflow
-        print("🐛 Bug Fix Results:")
-        print(f"\n📊 Diagnosis:\n{data.get('diagnosis', 'N/A')}")
-        print(f"\n🔧 Fix:\n{data.get('fix_explanation', 'N/A')}")
-        print(f"\n✅ Fixed Code:\n{data.get('fixed_code', 'N/A')}")
+        lines.append(BUGFIX_TMPL.format(
+            diagnosis=data.get('diagnosis', 'N/A'),
+            fix=data.get('fix_explanation', 'N/A'),
+            code=data.get('fixed_code', 'N/A')
+        ))
         
         if verbose and data.get('validation_tests'):
-            print(f"\n🧪 Validation Tests:\n{data.get('validation_tests')}")
+            lines.append(f"\n{_icon('🧪 ')}Validation Tests:\n{data.get('validation_tests')}")
     
     elif "code" in data and "explanation" in data:
         # Code generation workflow
-        print("⚡ Code Generation Results:")
-        print(f"\n📝 Understanding:\n{data.get('understanding', 'N/A')}")
-        print(f"\n💡 Code:\n{data.get('code', 'N/A')}")
-        print(f"\n📖 Explanation:\n{data.get('explanation', 'N/A')}")
+        lines.append(GENERATE_TMPL.format(
+            understanding=data.get('understanding', 'N/A'),
+            code=data.get('code', 'N/A'),
+            explanation=data.get('explanation', 'N/A')
+        ))
         
         if verbose and data.get('tests'):
-            print(f"\n🧪 Tests:\n{data.get('tests')}")
+            lines.append(f"\n{_icon('🧪 ')}Tests:\n{data.get('tests')}")
     
     elif "analysis" in data:
         # Analysis workflow
-        print("🔍 Code Analysis Results:")
-        print(f"\n📊 Analysis:\n{data.get('analysis', 'N/A')}")
-        print(f"\n⚠️ Issues:\n{data.get('issues', 'N/A')}")
-        print(f"\n🏗️ Architecture:\n{data.get('architecture', 'N/A')}")
+        lines.append(ANALYSIS_TMPL.format(
+            analysis=data.get('analysis', 'N/A'),
+            issues=data.get('issues', 'N/A'),
+            architecture=data.get('architecture', 'N/A')
+        ))
         
         if verbose and data.get('suggestions'):
-            print(f"\n💡 Suggestions:\n{data.get('suggestions')}")
+            lines.append(f"\n{_icon('💡 ')}Suggestions:\n{data.get('suggestions')}")
     
     elif "refactored_code" in data:
         # Refactoring workflow
-        print("🔧 Refactoring Results:")
-        print(f"\n✨ Improvements:\n{data.get('improvements', 'N/A')}")
-        print(f"\n🔄 Refactored Code:\n{data.get('refactored_code', 'N/A')}")
+        lines.append(REFACTOR_TMPL.format(
+            improvements=data.get('improvements', 'N/A'),
+            code=data.get('refactored_code', 'N/A')
+        ))
         
         if verbose and data.get('migration_guide'):
-            print(f"\n📋 Migration Guide:\n{data.get('migration_guide')}")
+            lines.append(f"\n{_icon('📋 ')}Migration Guide:\n{data.get('migration_guide')}")
     
     else:
         # Generic output
-        print("✅ Results:")
+        lines.append(f"{_icon('✅ ')}Results:")
         for key, value in data.items():
             if key not in ['original_code', 'code'] or verbose:
-                print(f"\n{key.replace('_', ' ').title()}:\n{value}")
+                lines.append(f"\n{key.replace('_', ' ').title()}:\n{value}")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 def save_output(result, output_file: str):
     """Save results to output file"""
@@ -159,7 +158,7 @@ def save_output(result, output_file: str):
         data = result.data
         
         # Determine what to save based on workflow
-        output_content = ""
+        output_content = None
         
         if "fixed_code" in data:
             output_content = data["fixed_code"]
@@ -167,16 +166,18 @@ def save_output(result, output_file: str):
             output_content = data["refactored_code"]
         elif "code" in data:
             output_content = data["code"]
-        else:
-            output_content = json.dumps(data, indent=2)
         
-        with open(output_file, 'w') as f:
-            f.write(output_content)
+        if output_content is not None:
+            write_output_file(output_file, output_content)
+        else:
+            # Stream JSON straight to the file rather than building the string first
+            with open(output_file, 'w', buffering=OUTPUT_BUFFER_SIZE, encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
         
-        print(f"💾 Output saved to {output_file}")
+        print(f"{_icon('💾 ')}Output saved to {output_file}")
         
     except Exception as e:
-        print(f"⚠️ Could not save output: {e}")
+        print(f"{_icon('⚠️ ')}Could not save output: {e}")
 
 def main():
     """Main CLI entry point"""
@@ -193,32 +194,32 @@ def main():
         # Handle special commands
         if args.workflow == "status":
             info = engine.get_model_info()
-            print("🔧 Atlas Coder DSPy Status:")
+            print(f"{_icon('🔧 ')}Atlas Coder DSPy Status:")
             for key, value in info.items():
                 print(f"  {key}: {value}")
             return
         
         if args.workflow == "test":
-            print("🧪 Testing model connection...")
+            print(f"{_icon('🧪 ')}Testing model connection...")
             success = engine.test_model()
             if success:
-                print("✅ Model test successful!")
+                print(f"{_icon('✅ ')}Model test successful!")
             else:
-                print("❌ Model test failed!")
+                print(f"{_icon('❌ ')}Model test failed!")
             return
         
         if args.workflow == "list":
             orchestrator = get_orchestrator()
             workflows = orchestrator.list_workflows()
-            print("📋 Available Workflows:")
+            print(f"{_icon('📋 ')}Available Workflows:")
             for workflow in workflows:
-                status = "✅" if workflow["available"] else "❌"
+                status = _icon("✅", "[x]") if workflow["available"] else _icon("❌", "[ ]")
                 print(f"  {status} {workflow['type']}: {workflow.get('description', 'No description')}")
             return
         
         # Validate required input for workflows
         if not args.input and args.workflow not in ["status", "test", "list"]:
-            print("❌ Error: Input required for this workflow")
+            print(f"{_icon('❌ ')}Error: Input required for this workflow")
             parser.print_help()
             sys.exit(1)
         
@@ -229,53 +230,16 @@ def main():
         # Get orchestrator and execute workflow
         orchestrator = get_orchestrator()
         
-        # Map CLI workflows to internal workflow types
-        workflow_map = {
-            "fix-bug": "bug_fix",
-            "generate": "generate", 
-            "analyze": "analyze",
-            "project": "project",
-            "refactor": "refactor"
-        }
-        
-        workflow_type = workflow_map.get(args.workflow)
+        workflow_type = WORKFLOW_MAP.get(args.workflow)
         if not workflow_type:
-            print(f"❌ Unknown workflow: {args.workflow}")
+            print(f"{_icon('❌ ')}Unknown workflow: {args.workflow}")
             sys.exit(1)
         
-        print(f"🚀 Executing {workflow_type} workflow...")
+        print(f"{_icon('🚀 ')}Executing {workflow_type} workflow...")
         
         # Prepare workflow parameters based on type
-        if workflow_type == "bug_fix":
-            result = orchestrator.execute_workflow(
-                workflow_type,
-                code=input_content,
-                error=context_content or "General error analysis"
-            )
-        elif workflow_type == "generate":
-            result = orchestrator.execute_workflow(
-                workflow_type,
-                requirements=input_content,
-                constraints=context_content
-            )
-        elif workflow_type == "analyze":
-            result = orchestrator.execute_workflow(
-                workflow_type,
-                code=input_content,
-                context=context_content
-            )
-        elif workflow_type == "project":
-            result = orchestrator.execute_workflow(
-                workflow_type,
-                requirements=input_content,
-                constraints=context_content
-            )
-        elif workflow_type == "refactor":
-            result = orchestrator.execute_workflow(
-                workflow_type,
-                code=input_content,
-                goals=context_content or "improve readability and maintainability"
-            )
+        task_params = PARAM_BUILDERS[workflow_type](input_content, context_content)
+        result = orchestrator.execute_workflow(workflow_type, **task_params)
         
         # Display results
         format_output(result, args.format, args.verbose)
@@ -285,10 +249,10 @@ def main():
             save_output(result, args.output)
     
     except KeyboardInterrupt:
-        print("\n🛑 Operation cancelled by user")
+        print(f"\n{_icon('🛑 ')}Operation cancelled by user")
         sys.exit(1)
     except Exception as e:
-        print(f"❌ Unexpected error: {e}")
+        print(f"{_icon('❌ ')}Unexpected error: {e}")
         if args.verbose:
             import traceback
             traceback.print_exc()
@@ -4,12 +4,16 @@ Atlas Coder DSPy v6 - Revolutionary Cost-Optimized CLI
 Progressive complexity + hybrid models + agentic operation
 """
 
-import os
 import sys
 import argparse
 import json
+import hashlib
+import sqlite3
+import time
+from types import MappingProxyType
 from typing import Optional
 from datetime import datetime
+from enum import Enum
 
 from dspy_core.engine import get_engine, initialize_engine
 from dspy_core.workflows import get_orchestrator
@@ -18,6 +22,34 @@ from dspy_core.optimization import get_cost_tracker, get_token_optimizer
 from dspy_core.model_strategy import get_model_strategy
 from dspy_core.agentic import get_agentic_manager
 from dspy_core.bootstrap import bootstrap_new_feature, self_improve
+from dspy_core.paths import atlas_home
+from dspy_core.cli_utils import (
+    WORKFLOW_MAP, PARAM_BUILDERS, OUTPUT_BUFFER_SIZE, icon as _icon, read_input, write_output_file
+)
+
+class AtlasEncoder(json.JSONEncoder):
+    """JSON encoder with direct handling for the types v6 results carry"""
+    
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        if isinstance(o, Enum):
+            return o.value
+        return str(o)
+
+LEVEL_MAP = MappingProxyType({
+    "quick": ExecutionLevel.QUICK_SCAN,
+    "detailed": ExecutionLevel.DETAILED_ANALYSIS,
+    "premium": ExecutionLevel.COMPREHENSIVE_SOLUTION
+})
+
+# CLI model strategy -> key in HybridModelStrategy.get_model_recommendations()
+STRATEGY_RECOMMENDATION_KEYS = MappingProxyType({
+    "cost-optimal": "cost_optimal",
+    "quality-optimal": "quality_optimal",
+    "balanced": "balanced",
+    "local-only": "cost_optimal"  # Prefer local
+})
 
 def setup_cli():
     """Setup advanced CLI with v6 features"""
@@ -161,42 +193,98 @@ Model Strategies:
         help="Minimal output"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the persistent response cache"
+    )
+    
     return parser
 
-def execute_with_progressive_complexity(command: str, args: argparse.Namespace) -> dict:
+# Persistent cache of workflow results, keyed by command/input/context/model settings.
+# Lives in ~/.atlas like the other user-level state; entries expire after
+# RESPONSE_CACHE_TTL seconds and only the newest RESPONSE_CACHE_MAX_ENTRIES are kept
+RESPONSE_CACHE_NAME = "response_cache.sqlite"
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+_response_cache = None
+
+def _get_response_cache() -> sqlite3.Connection:
+    """Open (once) the SQLite response cache"""
+    global _response_cache
+    if _response_cache is None:
+        conn = sqlite3.connect(atlas_home() / RESPONSE_CACHE_NAME)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)")
+        _response_cache = conn
+    return _response_cache
+
+def response_cache_key(command: str, args: argparse.Namespace, input_content: str) -> str:
+    """Build the response cache key for a core command"""
+    raw = (f"{command}|{input_content}|{args.context or ''}|{args.model or 'auto'}|{args.level or 'auto'}"
+           f"|{args.model_strategy or 'auto'}|{args.max_cost if args.max_cost is not None else 'auto'}")
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+def load_cached_response(key: str) -> Optional[dict]:
+    """Return a cached result for key, or None on miss or expiry"""
+    try:
+        row = _get_response_cache().execute(
+            "SELECT result FROM cache WHERE key = ? AND created_at >= ?",
+            (key, time.time() - RESPONSE_CACHE_TTL)
+        ).fetchone()
+    except (OSError, sqlite3.Error):
+        return None
+    return json.loads(row[0]) if row else None
+
+def store_cached_response(key: str, result: dict):
+    """Persist a successful result under key, dropping expired and surplus entries"""
+    now = time.time()
+    try:
+        conn = _get_response_cache()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, result, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result, cls=AtlasEncoder), now)
+            )
+            conn.execute(
+                "DELETE FROM cache WHERE created_at < ? OR key IN "
+                "(SELECT key FROM cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (now - RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES)
+            )
+    except (OSError, sqlite3.Error):
+        pass
+
+def execute_with_progressive_complexity(command: str, args: argparse.Namespace,
+                                        input_content: Optional[str] = None) -> dict:
     """Execute command with progressive complexity"""
+    input_arg = args.input
+    max_cost = args.max_cost
+    level_name = args.level
+    strategy_name = args.model_strategy
     
     # Determine execution level
-    level_map = {
-        "quick": ExecutionLevel.QUICK_SCAN,
-        "detailed": ExecutionLevel.DETAILED_ANALYSIS, 
-        "premium": ExecutionLevel.COMPREHENSIVE_SOLUTION
-    }
-    
     initial_level = None
-    if args.level:
-        initial_level = level_map[args.level]
+    if level_name:
+        initial_level = LEVEL_MAP[level_name]
     
     # Setup model strategy
-    if args.model_strategy:
+    if strategy_name:
         strategy = get_model_strategy()
         recommendations = strategy.get_model_recommendations(command, 3.0)
         
-        model_map = {
-            "cost-optimal": recommendations.get('cost_optimal'),
-            "quality-optimal": recommendations.get('quality_optimal'),
-            "balanced": recommendations.get('balanced'),
-            "local-only": recommendations.get('cost_optimal')  # Prefer local
-        }
-        
-        recommended_model = model_map.get(args.model_strategy)
+        recommended_model = recommendations.get(STRATEGY_RECOMMENDATION_KEYS[strategy_name])
         if recommended_model and not args.model:
-            print(f"🎯 Using {args.model_strategy} model: {recommended_model}")
+            print(f"{_icon('🎯 ')}Using {strategy_name} model: {recommended_model}")
     
     # Apply cost constraints
-    if args.max_cost:
+    if max_cost:
         cost_tracker = get_cost_tracker()
-        if not cost_tracker.can_afford_task(args.max_cost):
+        if not cost_tracker.can_afford_task(max_cost):
             return {
                 'success': False,
                 'error': f'Insufficient budget. Remaining: ${cost_tracker.get_remaining_budget():.3f}'
@@ -206,43 +294,23 @@ def execute_with_progressive_complexity(command: str, args: argparse.Namespace)
     executor = get_progressive_executor()
     
     # Map commands to workflow types
-    workflow_map = {
-        "fix-bug": "bug_fix",
-        "generate": "generate",
-        "analyze": "analyze", 
-        "project": "project",
-        "refactor": "refactor"
-    }
-    
-    workflow_type = workflow_map.get(command)
+    workflow_type = WORKFLOW_MAP.get(command)
     if not workflow_type:
         return {'success': False, 'error': f'Unknown command: {command}'}
     
     # Prepare parameters
     task_params = {}
-    if args.input:
+    if input_arg:
         # Read input file or use directly
-        if os.path.isfile(args.input):
-            with open(args.input, 'r') as f:
-                input_content = f.read()
-        else:
-            input_content = args.input
+        if input_content is None:
+            input_content = read_input(input_arg)
         
         # Map input to appropriate parameter
-        if workflow_type == "bug_fix":
-            task_params = {"code": input_content, "error": args.context or "General error analysis"}
-        elif workflow_type == "generate":
-            task_params = {"requirements": input_content, "constraints": args.context or ""}
-        elif workflow_type == "analyze":
-            task_params = {"code": input_content, "context": args.context or ""}
-        elif workflow_type == "project":
-            task_params = {"requirements": input_content, "constraints": args.context or ""}
-        elif workflow_type == "refactor":
-            task_params = {"code": input_content, "goals": args.context or "improve readability and maintainability"}
+        task_params = PARAM_BUILDERS[workflow_type](input_content, args.context or "")
     
     # Add execution preferences
-    if args.max_cost:
-        task_params["max_cost"] = args.max_cost
+    if max_cost:
+        task_params["max_cost"] = max_cost
     
     # Execute
     result = executor.execute_with_escalation(workflow_type, task_params, initial_level)
@@ -266,8 +334,9 @@ def handle_agentic_commands(args: argparse.Namespace) -> dict:
             # Estimate iterations based on budget
             cost_tracker = get_cost_tracker()
             cost_tracker.daily_budget = args.max_budget
+            manager.daily_budget = args.max_budget
         
-        print(f"🤖 Starting continuous agentic operation (budget: ${args.max_budget or 3.0})")
+        print(f"{_icon('🤖 ')}Starting continuous agentic operation (budget: ${args.max_budget or 3.0})")
         manager.run_continuous_agent(max_iterations)
         
         return {'success': True, 'message': 'Agentic operation completed'}
@@ -275,17 +344,25 @@ def handle_agentic_commands(args: argparse.Namespace) -> dict:
     elif args.scan_work:
         opportunities = manager.detect_work_opportunities()
         
+        # Single pass for both aggregates
+        high_value_count = 0
+        estimated_total_cost = 0.0
+        for w in opportunities:
+            estimated_total_cost += w.estimated_cost
+            if w.value_score > 0.7:
+                high_value_count += 1
+        
         return {
             'success': True,
             'work_opportunities': len(opportunities),
-            'high_value_count': len([w for w in opportunities if w.value_score > 0.7]),
-            'estimated_total_cost': sum(w.estimated_cost for w in opportunities),
+            'high_value_count': high_value_count,
+            'estimated_total_cost': estimated_total_cost,
             'opportunities': [
                 {
                     'description': w.description,
                     'value_score': w.value_score,
                     'estimated_cost': w.estimated_cost,
-                    'priority': w.priority.value
+                    'priority': w.priority.name.lower()
                 } for w in opportunities[:5]  # Top 5
             ]
         }
@@ -346,68 +423,112 @@ def handle_optimization_commands(args: argparse.Namespace) -> dict:
     
     return {'success': True, **results}
 
+# Result templates for text output
+BUGFIX_TMPL = f"{_icon('🐛 ')}Bug Fix Results:\n\n{_icon('📊 ')}Diagnosis:\n{{diagnosis}}\n\n{_icon('🔧 ')}Fix:\n{{fix}}\n\n{_icon('✅ ')}Fixed Code:\n{{code}}"
+GENERATE_TMPL = f"{_icon('⚡ ')}Code Generation Results:\n\n{_icon('💡 ')}Code:\n{{code}}\n\n{_icon('📖 ')}Explanation:\n{{explanation}}"
+ANALYSIS_TMPL = f"{_icon('🔍 ')}Code Analysis Results:\n\n{_icon('📊 ')}Analysis:\n{{analysis}}\n\n{_icon('⚠️ ')}Issues:\n{{issues}}"
+REFACTOR_TMPL = f"{_icon('🔧 ')}Refactoring Results:\n\n{_icon('✨ ')}Improvements:\n{{improvements}}\n\n{_icon('🔄 ')}Refactored Code:\n{{code}}"
+
+def _fmt_bugfix(data: dict, verbose: bool) -> list:
+    return [BUGFIX_TMPL.format(
+        diagnosis=data.get('diagnosis', 'N/A'),
+        fix=data.get('fix_explanation', 'N/A'),
+        code=data.get('fixed_code', 'N/A')
+    )]
+
+def _fmt_gen(data: dict, verbose: bool) -> list:
+    return [GENERATE_TMPL.format(
+        code=data.get('code', 'N/A'),
+        explanation=data.get('explanation', 'N/A')
+    )]
+
+def _fmt_analysis(data: dict, verbose: bool) -> list:
+    return [ANALYSIS_TMPL.format(
+        analysis=data.get('analysis', 'N/A'),
+        issues=data.get('issues', 'N/A')
+    )]
+
+def _fmt_refactor(data: dict, verbose: bool) -> list:
+    return [REFACTOR_TMPL.format(
+        improvements=data.get('improvements', 'N/A'),
+        code=data.get('refactored_code', 'N/A')
+    )]
+
+METADATA_KEYS = ('execution_level', 'cost', 'quality_score', 'escalation_used')
+
+def _fmt_metadata(result: dict) -> str:
+    """Render the verbose execution metadata block"""
+    meta = {k: result[k] for k in METADATA_KEYS if k in result}
+    parts = [f"{_icon('📊 ')}Execution Metadata:"]
+    if 'execution_level' in meta:
+        parts.append(f"   Level: {meta['execution_level']}")
+    if 'cost' in meta:
+        parts.append(f"   Cost: ${meta['cost']:.4f}")
+    if 'quality_score' in meta:
+        parts.append(f"   Quality: {meta['quality_score']:.2f}")
+    if 'escalation_used' in meta:
+        parts.append(f"   Escalation: {'Yes' if meta['escalation_used'] else 'No'}")
+    parts.append("")
+    return '\n'.join(parts)
+
+# Result formatters in priority order, keyed by the data keys they require
+FORMATTERS = (
+    (frozenset({"fixed_code"}), _fmt_bugfix),
+    (frozenset({"code", "explanation"}), _fmt_gen),
+    (frozenset({"analysis"}), _fmt_analysis),
+    (frozenset({"refactored_code"}), _fmt_refactor),
+)
+
 def format_v6_output(result: dict, format_type: str, verbose: bool = False):
     """Format v6 output with enhanced information"""
     if not result.get('success', False):
-        print(f"❌ Error: {result.get('error', 'Unknown error')}")
+        print(f"{_icon('❌ ')}Error: {result.get('error', 'Unknown error')}")
         return
     
     if format_type == "json":
-        print(json.dumps(result, indent=2, default=str))
+        json.dump(result, sys.stdout, indent=2, cls=AtlasEncoder)
+        sys.stdout.write('\n')
         return
     
-    # Enhanced text formatting
+    # Enhanced text formatting - sections are collected and written once
+    lines = []
+    
     if 'data' in result:
         data = result['data']
         
         # Show execution metadata
         if verbose:
-            print("📊 Execution Metadata:")
-            if 'execution_level' in result:
-                print(f"   Level: {result['execution_level']}")
-            if 'cost' in result:
-                print(f"   Cost: ${result['cost']:.4f}")
-            if 'quality_score' in result:
-                print(f"   Quality: {result['quality_score']:.2f}")
-            if 'escalation_used' in result:
-                escalation = "Yes" if result['escalation_used'] else "No"
-                print(f"   Escalation: {escalation}")
-            print()
+            lines.append(_fmt_metadata(result))
         
-        # Show main results (existing format_output logic)
-        if "fixed_code" in data:
-            print("🐛 Bug Fix Results:")
-            print(f"\n📊 Diagnosis:\n{data.get('diagnosis', 'N/A')}")
-            print(f"\n🔧 Fix:\n{data.get('fix_explanation', 'N/A')}")
-            print(f"\n✅ Fixed Code:\n{data.get('fixed_code', 'N/A')}")
-        elif "code" in data and "explanation" in data:
-            print("⚡ Code Generation Results:")
-            print(f"\n💡 Code:\n{data.get('code', 'N/A')}")
-            print(f"\n📖 Explanation:\n{data.get('explanation', 'N/A')}")
-        elif "analysis" in data:
-            print("🔍 Code Analysis Results:")
-            print(f"\n📊 Analysis:\n{data.get('analysis', 'N/A')}")
-            print(f"\n⚠️ Issues:\n{data.get('issues', 'N/A')}")
+        # Show main results - first formatter whose required keys are present wins
+        keyset = data.keys()
+        for required, formatter in FORMATTERS:
+            if required <= keyset:
+                lines.extend(formatter(data, verbose))
+                break
     
     # Show additional v6 results
     if 'agent_status' in result:
         status = result['agent_status']
-        print("🤖 Agent Status:")
+        lines.append(f"{_icon('🤖 ')}Agent Status:")
         for key, value in status.items():
-            print(f"   {key.replace('_', ' ').title()}: {value}")
+            lines.append(f"   {key.replace('_', ' ').title()}: {value}")
     
     if 'cost_analysis' in result:
         analysis = result['cost_analysis']
-        print("💰 Cost Analysis:")
+        lines.append(f"{_icon('💰 ')}Cost Analysis:")
         efficiency = analysis['efficiency']
-        print(f"   Quality per Dollar: {efficiency.get('quality_per_dollar', 0):.2f}")
-        print(f"   Tasks Completed: {efficiency.get('tasks_completed', 0)}")
-        print(f"   Average Cost: ${efficiency.get('cost_per_task', 0):.4f}")
+        lines.append(f"   Quality per Dollar: {efficiency.get('quality_per_dollar', 0):.2f}")
+        lines.append(f"   Tasks Completed: {efficiency.get('tasks_completed', 0)}")
+        lines.append(f"   Average Cost: ${efficiency.get('cost_per_task', 0):.4f}")
     
     if 'work_opportunities' in result:
-        print(f"📋 Found {result['work_opportunities']} work opportunities")
-        print(f"🎯 High-value opportunities: {result.get('high_value_count', 0)}")
-        print(f"💰 Estimated total cost: ${result.get('estimated_total_cost', 0):.3f}")
+        lines.append(f"{_icon('📋 ')}Found {result['work_opportunities']} work opportunities")
+        lines.append(f"{_icon('🎯 ')}High-value opportunities: {result.get('high_value_count', 0)}")
+        lines.append(f"{_icon('💰 ')}Estimated total cost: ${result.get('estimated_total_cost', 0):.3f}")
+    
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 def main():
     """Main v6 CLI entry point"""
@@ -427,37 +548,37 @@ def main():
             cost_tracker = get_cost_tracker()
             strategy = get_model_strategy()
             
-            print("🔧 Atlas Coder DSPy v6 Status:")
-            print(f"🧠 Model: {info['model']}")
-            print(f"💾 Cache: {info['cache_entries']} entries ({info['cache_hit_rate']})")
-            print(f"💰 Budget: ${cost_tracker.get_remaining_budget():.3f} remaining")
-            print(f"🎯 Strategy: {strategy.current_model or 'Auto-select'}")
+            print(f"{_icon('🔧 ')}Atlas Coder DSPy v6 Status:")
+            print(f"{_icon('🧠 ')}Model: {info['model']}")
+            print(f"{_icon('💾 ')}Cache: {info['cache_entries']} entries ({info['cache_hit_rate']})")
+            print(f"{_icon('💰 ')}Budget: ${cost_tracker.get_remaining_budget():.3f} remaining")
+            print(f"{_icon('🎯 ')}Strategy: {strategy.current_model or 'Auto-select'}")
             return
         
         elif args.command == "test":
-            print("🧪 Testing v6 systems...")
+            print(f"{_icon('🧪 ')}Testing v6 systems...")
             success = engine.test_model()
             if success:
-                print("✅ All systems operational!")
+                print(f"{_icon('✅ ')}All systems operational!")
             else:
-                print("❌ System test failed!")
+                print(f"{_icon('❌ ')}System test failed!")
             return
         
         elif args.command == "list":
             orchestrator = get_orchestrator()
             workflows = orchestrator.list_workflows()
-            print("📋 Available Workflows:")
+            print(f"{_icon('📋 ')}Available Workflows:")
             for workflow in workflows:
-                status = "✅" if workflow["available"] else "❌"
+                status = _icon("✅", "[x]") if workflow["available"] else _icon("❌", "[ ]")
                 print(f"  {status} {workflow['type']}: {workflow.get('description', 'No description')}")
             
             # Show v6 features
-            print("\n🚀 v6 Features:")
-            print("  ✅ Progressive Complexity Execution")
-            print("  ✅ Hybrid Model Strategy")
-            print("  ✅ Agentic Work Detection")
-            print("  ✅ Real-time Cost Optimization")
-            print("  ✅ DSPy Bootstrap Development")
+            print(f"\n{_icon('🚀 ')}v6 Features:")
+            print(f"  {_icon('✅ ', '- ')}Progressive Complexity Execution")
+            print(f"  {_icon('✅ ', '- ')}Hybrid Model Strategy")
+            print(f"  {_icon('✅ ', '- ')}Agentic Work Detection")
+            print(f"  {_icon('✅ ', '- ')}Real-time Cost Optimization")
+            print(f"  {_icon('✅ ', '- ')}DSPy Bootstrap Development")
             return
         
         # Handle agentic commands
@@ -471,10 +592,10 @@ def main():
         # Handle bootstrap command
         elif args.command == "bootstrap":
             if not args.input:
-                print("❌ Feature description required for bootstrap")
+                print(f"{_icon('❌ ')}Feature description required for bootstrap")
                 sys.exit(1)
             
-            print(f"🚀 Bootstrapping new feature: {args.input}")
+            print(f"{_icon('🚀 ')}Bootstrapping new feature: {args.input}")
             bootstrap_result = bootstrap_new_feature(args.input)
             
             result = {
@@ -486,11 +607,20 @@ def main():
         # Handle core development commands with progressive complexity
         else:
             if not args.input:
-                print("❌ Input required for this command")
+                print(f"{_icon('❌ ')}Input required for this command")
                 parser.print_help()
                 sys.exit(1)
             
-            result = execute_with_progressive_complexity(args.command, args)
+            input_content = read_input(args.input)
+            cache_key = response_cache_key(args.command, args, input_content)
+            result = None if args.no_cache else load_cached_response(cache_key)
+            
+            if result is not None:
+                result['cached'] = True
+            else:
+                result = execute_with_progressive_complexity(args.command, args, input_content)
+                if result.get('success') and not args.no_cache:
+                    store_cached_response(cache_key, result)
         
         # Display results
         if not args.quiet:
@@ -501,10 +631,10 @@ def main():
             save_output(result, args.output)
     
     except KeyboardInterrupt:
-        print("\n🛑 Operation cancelled by user")
+        print(f"\n{_icon('🛑 ')}Operation cancelled by user")
         sys.exit(1)
     except Exception as e:
-        print(f"❌ Unexpected error: {e}")
+        print(f"{_icon('❌ ')}Unexpected error: {e}")
         if args.verbose:
             import traceback
             traceback.print_exc()
@@ -516,24 +646,28 @@ def save_output(result: dict, output_file: str):
         data = result.get('data', {})
         
         # Determine content to save
+        content = None
         if "fixed_code" in data:
             content = data["fixed_code"]
         elif "refactored_code" in data:
             content = data["refactored_code"]
         elif "code" in data:
             content = data["code"]
-        elif "bootstrap_result" in result:
-            content = json.dumps(result["bootstrap_result"], indent=2)
-        else:
-            content = json.dumps(result, indent=2, default=str)
         
-        with open(output_file, 'w') as f:
-            f.write(content)
+        if content is not None:
+            write_output_file(output_file, content)
+        else:
+            # JSON payloads are streamed straight to the file
+            with open(output_file, 'w', buffering=OUTPUT_BUFFER_SIZE, encoding='utf-8') as f:
+                if "bootstrap_result" in result:
+                    json.dump(result["bootstrap_result"], f, indent=2)
+                else:
+                    json.dump(result, f, indent=2, cls=AtlasEncoder)
         
-        print(f"💾 Output saved to {output_file}")
+        print(f"{_icon('💾 ')}Output saved to {output_file}")
         
     except Exception as e:
-        print(f"⚠️ Could not save output: {e}")
+        print(f"{_icon('⚠️ ')}Could not save output: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
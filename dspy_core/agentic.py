@@ -4,28 +4,33 @@ Intelligent autonomous operation with meaningful work detection
 """
 
 import os
+import re
+import hashlib
 import time
 import json
-import subprocess
 import threading
-from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
-from dataclasses import dataclass, asdict
-from enum import Enum
+from types import MappingProxyType
+from dataclasses import dataclass
+from enum import Enum, IntEnum
 
 import dspy
 from .signatures import *
 from .optimization import get_cost_tracker
 from .progressive_execution import get_progressive_executor
+from .git_state import read_git_state
 
-class WorkPriority(Enum):
+class WorkPriority(IntEnum):
     """Work priority levels"""
-    URGENT = "urgent"          # Immediate attention needed
-    HIGH = "high"              # Important but not urgent
-    MEDIUM = "medium"          # Normal priority
-    LOW = "low"                # Background tasks
-    MAINTENANCE = "maintenance" # System maintenance
+    URGENT = 0                 # Immediate attention needed
+    HIGH = 1                   # Important but not urgent
+    MEDIUM = 2                 # Normal priority
+    LOW = 3                    # Background tasks
+    MAINTENANCE = 4            # System maintenance
 
 class WorkType(Enum):
     """Types of work Atlas Coder can perform"""
@@ -39,6 +44,75 @@ class WorkType(Enum):
     DEPENDENCY_UPDATE = "dependency_update"
     PERFORMANCE_ANALYSIS = "performance_analysis"
 
+# Workflow used to execute each type of work
+_WORKFLOW_MAP = MappingProxyType({
+    WorkType.BUG_FIX: 'bug_fix',
+    WorkType.CODE_REVIEW: 'analyze',
+    WorkType.OPTIMIZATION: 'refactor',
+    WorkType.DOCUMENTATION: 'analyze',  # Will generate docs
+    WorkType.TESTING: 'generate',       # Will generate tests
+    WorkType.REFACTORING: 'refactor',
+    WorkType.SECURITY_AUDIT: 'analyze',
+    WorkType.PERFORMANCE_ANALYSIS: 'analyze'
+})
+
+# File types listed in the project state summary, in display order
+_IMPORTANT_EXTENSIONS = ('.py', '.js', '.ts', '.md', '.txt')
+
+# Estimate parsers used on every assessed opportunity
+_EFFORT_RE = re.compile(r'\d+')
+_COST_RE = re.compile(r'\$?(\d+\.?\d*)')
+
+# Compact, non-escaping encoder for state log lines
+_encode_state = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+# Scoring weight applied to value_score, indexed by WorkPriority value
+_PRIORITY_WEIGHTS = (1000.0, 100.0, 10.0, 1.0, 0.1)
+
+# Conservative assessment used when the assessor fails
+_DEFAULT_ASSESSMENT = (0.3, 30.0, 0.02, WorkPriority.MEDIUM)
+
+def _assessment_key(description: str) -> str:
+    """Cache key for an opportunity description, ignoring case and spacing"""
+    normalized = ' '.join(description.lower().split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+def _read_span(path: Path, chars: int, from_end: bool) -> str:
+    """Decode at most `chars` characters from one end of a file without reading the rest"""
+    # UTF-8 needs at most 4 bytes per character, so this span always holds enough text
+    span = chars * 4
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        offset = max(0, size - span) if from_end else 0
+        data = os.pread(fd, min(span, size), offset)
+    finally:
+        os.close(fd)
+    # A character cut at the span boundary is dropped rather than replaced
+    text = data.decode('utf-8', 'ignore')
+    return text[-chars:] if from_end else text[:chars]
+
+def _head_text(path: Path, chars: int) -> str:
+    """First `chars` characters of a text file"""
+    return _read_span(path, chars, from_end=False)
+
+def _tail_text(path: Path, chars: int) -> str:
+    """Last `chars` characters of a text file"""
+    return _read_span(path, chars, from_end=True)
+
+# Small pool for independent context file reads, created on first use
+_context_read_pool = None
+_context_read_pool_lock = threading.Lock()
+
+def _get_context_read_pool() -> ThreadPoolExecutor:
+    """Get the shared pool used to read context files in parallel"""
+    global _context_read_pool
+    if _context_read_pool is None:
+        with _context_read_pool_lock:
+            if _context_read_pool is None:
+                _context_read_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="atlas-ctx")
+    return _context_read_pool
+
 @dataclass
 class WorkItem:
     """Represents a unit of work to be done"""
@@ -56,29 +130,41 @@ class WorkItem:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
-        data = asdict(self)
-        # Convert datetime objects to ISO strings
-        data['created_at'] = self.created_at.isoformat()
-        if self.deadline:
-            data['deadline'] = self.deadline.isoformat()
-        # Convert enums to strings
-        data['type'] = self.type.value
-        data['priority'] = self.priority.value
-        return data
+        # Built by hand so context and dependencies are shared rather than deep-copied
+        return {
+            'id': self.id,
+            'type': self.type.value,
+            # Lowercase name keeps the stored and displayed format independent of the enum values
+            'priority': self.priority.name.lower(),
+            'description': self.description,
+            'context': self.context,
+            'estimated_effort': self.estimated_effort,
+            'estimated_cost': self.estimated_cost,
+            'value_score': self.value_score,
+            'deadline': self.deadline.isoformat() if self.deadline else None,
+            'dependencies': self.dependencies,
+            'created_at': self.created_at.isoformat()
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'WorkItem':
         """Create from dictionary"""
-        # Convert strings back to datetime objects
-        data['created_at'] = datetime.fromisoformat(data['created_at'])
-        if data.get('deadline'):
-            data['deadline'] = datetime.fromisoformat(data['deadline'])
-        else:
-            data['deadline'] = None
-        # Convert strings back to enums
-        data['type'] = WorkType(data['type'])
-        data['priority'] = WorkPriority(data['priority'])
-        return cls(**data)
+        deadline = data.get('deadline')
+        priority = data['priority']
+        return cls(
+            id=data['id'],
+            type=WorkType(data['type']),
+            # Stored as the lowercase name; integer priorities are accepted as well
+            priority=WorkPriority[priority.upper()] if isinstance(priority, str) else WorkPriority(priority),
+            description=data['description'],
+            context=data['context'],
+            estimated_effort=data['estimated_effort'],
+            estimated_cost=data['estimated_cost'],
+            value_score=data['value_score'],
+            deadline=datetime.fromisoformat(deadline) if deadline else None,
+            dependencies=data['dependencies'],
+            created_at=datetime.fromisoformat(data['created_at'])
+        )
 
 # Agentic signatures for work detection and analysis
 class DetectMeaningfulWork(dspy.Signature):
@@ -100,6 +186,13 @@ class AssessWorkValue(dspy.Signature):
     cost_estimate = dspy.OutputField(desc="Estimated cost in dollars")
     urgency_level = dspy.OutputField(desc="Urgency level: urgent, high, medium, low, maintenance")
 
+class AssessWorkValueBatch(dspy.Signature):
+    """Assess the value and priority of several potential work items in one pass"""
+    work_descriptions = dspy.InputField(desc="Potential work items, one description per line")
+    project_context = dspy.InputField(desc="Current project context and goals")
+    resource_constraints = dspy.InputField(desc="Available resources and constraints")
+    assessments = dspy.OutputField(desc="JSON array with one object per work item, in input order, with keys value_score (0.0 to 1.0), effort_estimate (minutes), cost_estimate (dollars), urgency_level (urgent, high, medium, low, maintenance)")
+
 class PlanWorkSequence(dspy.Signature):
     """Plan optimal sequence for executing multiple work items"""
     work_items = dspy.InputField(desc="List of work items to be sequenced")
@@ -121,11 +214,15 @@ class AgenticWorkManager:
         # Work detection modules
         self.work_detector = dspy.ChainOfThought(DetectMeaningfulWork)
         self.value_assessor = dspy.ChainOfThought(AssessWorkValue)
+        self.batch_value_assessor = dspy.ChainOfThought(AssessWorkValueBatch)
         self.work_planner = dspy.ChainOfThought(PlanWorkSequence)
         
         # State management
         self.work_queue: List[WorkItem] = []
-        self.completed_work: List[WorkItem] = []
+        # Recent completions stay in memory; older ones spill to monthly archives
+        self.completed_history_limit = 500
+        self.completed_work: Deque[WorkItem] = deque(maxlen=self.completed_history_limit)
+        self._completed_ids: Set[str] = set()  # Includes archived completions
         self.active_work: Optional[WorkItem] = None
         
         # Configuration
@@ -134,17 +231,38 @@ class AgenticWorkManager:
         self.scan_interval = 300  # 5 minutes between scans
         self.cost_threshold_per_task = 0.05  # 5 cents max per task
         
-        # State files
+        # State files: append-only JSONL logs, compacted every compact_every appends
         self.state_dir = self.project_root / ".atlas_coder"
         self.state_dir.mkdir(exist_ok=True)
-        self.work_queue_file = self.state_dir / "work_queue.json"
-        self.completed_work_file = self.state_dir / "completed_work.json"
+        self.work_queue_file = self.state_dir / "work_queue.jsonl"
+        self.completed_work_file = self.state_dir / "completed_work.jsonl"
+        self.compact_every = 100
+        self._appends_since_compact = 0
+        
+        # Scans run on a background worker while the main loop keeps executing;
+        # the lock guards work_queue/active_work shared between the two threads
+        self._state_lock = threading.RLock()
+        self._scan_pool: Optional[ThreadPoolExecutor] = None
+        
+        # Wakes the agent loop early when a scan finishes or work completes
+        self._wakeup = threading.Condition()
+        self._wakeup_pending = False
+        
+        # Memoized project context: name -> (validity key, value)
+        self._ctx_cache: Dict[str, Tuple[Any, str]] = {}
+        
+        # Assessments of recurring opportunities: description key -> (timestamp, result)
+        self.assessment_cache_file = self.state_dir / "assessment_cache.jsonl"
+        self.assessment_cache_ttl = 86400  # 24 hours
+        self._assessment_cache: Dict[str, Tuple[float, Tuple[float, float, float, WorkPriority]]] = {}
         
         self._load_state()
+        self._load_assessment_cache()
     
     def detect_work_opportunities(self) -> List[WorkItem]:
         """Scan project for meaningful work opportunities"""
         print("🔍 Scanning for work opportunities...")
+        self._ctx_cache.clear()
         
         try:
             # Gather project state
@@ -175,28 +293,150 @@ class AgenticWorkManager:
     
     def assess_work_value(self, work_description: str, work_type: WorkType) -> Tuple[float, float, float, WorkPriority]:
         """Assess value, effort, cost, and priority for work"""
+        # Shares the 24h assessment cache; failures fall back to conservative defaults
+        return self.assess_work_values([work_description])[0]
+    
+    def _assess_one(self, work_description: str) -> Tuple[float, float, float, WorkPriority]:
+        """Run the single-item assessor; raises on failure"""
+        project_context = self._get_project_context()
+        remaining_budget = self.cost_tracker.get_remaining_budget()
+        
+        assessment = self.value_assessor(
+            work_description=work_description,
+            project_context=project_context,
+            resource_constraints=f"Budget remaining: ${remaining_budget:.2f}, Daily limit: ${self.daily_budget}"
+        )
+        
+        # Parse outputs
+        value_score = float(assessment.value_score.split()[0]) if assessment.value_score else 0.5
+        effort_minutes = self._parse_effort(assessment.effort_estimate)
+        cost_dollars = self._parse_cost(assessment.cost_estimate)
+        priority = self._parse_priority(assessment.urgency_level)
+        
+        return value_score, effort_minutes, cost_dollars, priority
+    
+    def assess_work_values(self, work_descriptions: List[str]) -> List[Tuple[float, float, float, WorkPriority]]:
+        """Assess several work descriptions, reusing recent assessments of the same text"""
+        now = time.time()
+        results: List[Optional[Tuple[float, float, float, WorkPriority]]] = []
+        misses = []
+        for i, description in enumerate(work_descriptions):
+            cached = self._assessment_cache.get(_assessment_key(description))
+            if cached is not None and now - cached[0] < self.assessment_cache_ttl:
+                results.append(cached[1])
+            else:
+                results.append(None)
+                misses.append(i)
+        
+        if misses:
+            fresh = self._assess_uncached([work_descriptions[i] for i in misses])
+            new_entries = {}
+            for i, assessment in zip(misses, fresh):
+                if assessment is None:
+                    results[i] = _DEFAULT_ASSESSMENT
+                    continue
+                results[i] = assessment
+                new_entries[_assessment_key(work_descriptions[i])] = (now, assessment)
+            self._store_assessments(new_entries)
+        
+        return results
+    
+    def _assess_uncached(self, work_descriptions: List[str]) -> List[Optional[Tuple[float, float, float, WorkPriority]]]:
+        """Assess descriptions with a single LLM call; None marks a failed row"""
+        if len(work_descriptions) == 1:
+            try:
+                return [self._assess_one(work_descriptions[0])]
+            except Exception as e:
+                print(f"⚠️ Work assessment failed: {e}")
+                return [None]
+        
         try:
             project_context = self._get_project_context()
             remaining_budget = self.cost_tracker.get_remaining_budget()
             
-            assessment = self.value_assessor(
-                work_description=work_description,
+            assessment = self.batch_value_assessor(
+                work_descriptions='\n'.join(work_descriptions),
                 project_context=project_context,
                 resource_constraints=f"Budget remaining: ${remaining_budget:.2f}, Daily limit: ${self.daily_budget}"
             )
-            
-            # Parse outputs
-            value_score = float(assessment.value_score.split()[0]) if assessment.value_score else 0.5
-            effort_minutes = self._parse_effort(assessment.effort_estimate)
-            cost_dollars = self._parse_cost(assessment.cost_estimate)
-            priority = self._parse_priority(assessment.urgency_level)
-            
-            return value_score, effort_minutes, cost_dollars, priority
+            rows = self._parse_batch_assessments(assessment.assessments)
             
         except Exception as e:
-            print(f"⚠️ Work assessment failed: {e}")
-            # Default conservative values
-            return 0.3, 30.0, 0.02, WorkPriority.MEDIUM
+            print(f"⚠️ Batch work assessment failed: {e}")
+            return [None] * len(work_descriptions)
+        
+        results = []
+        for i in range(len(work_descriptions)):
+            row = rows[i] if i < len(rows) else None
+            if not isinstance(row, dict):
+                results.append(None)
+                continue
+            try:
+                value_score = float(str(row.get('value_score', 0.5)).split()[0])
+            except (ValueError, IndexError):
+                value_score = _DEFAULT_ASSESSMENT[0]
+            results.append((
+                value_score,
+                self._parse_effort(str(row.get('effort_estimate', ''))),
+                self._parse_cost(str(row.get('cost_estimate', ''))),
+                self._parse_priority(str(row.get('urgency_level', '')))
+            ))
+        return results
+    
+    def _parse_batch_assessments(self, assessments: str) -> List[Any]:
+        """Extract the JSON array of assessments from LLM output"""
+        start = assessments.find('[')
+        end = assessments.rfind(']')
+        if start == -1 or end < start:
+            return []
+        try:
+            rows = json.loads(assessments[start:end + 1])
+        except json.JSONDecodeError:
+            return []
+        return rows if isinstance(rows, list) else []
+    
+    def _load_assessment_cache(self):
+        """Load unexpired assessments, dropping stale lines from the log"""
+        if not self.assessment_cache_file.exists():
+            return
+        
+        now = time.time()
+        lines = 0
+        try:
+            with open(self.assessment_cache_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    lines += 1
+                    entry = json.loads(line)
+                    if now - entry['at'] < self.assessment_cache_ttl:
+                        value, effort, cost, priority = entry['result']
+                        self._assessment_cache[entry['key']] = (
+                            entry['at'], (value, effort, cost, WorkPriority(priority))
+                        )
+        except Exception as e:
+            print(f"⚠️ Assessment cache load failed: {e}")
+            return
+        
+        if lines > len(self._assessment_cache):
+            self._write_assessment_cache(self._assessment_cache, 'w')
+    
+    def _store_assessments(self, entries: Dict[str, Tuple[float, Tuple[float, float, float, WorkPriority]]]):
+        """Remember fresh assessments in memory and on disk"""
+        if entries:
+            self._assessment_cache.update(entries)
+            self._write_assessment_cache(entries, 'a')
+    
+    def _write_assessment_cache(self, entries: Dict[str, Tuple[float, Tuple[float, float, float, WorkPriority]]], mode: str):
+        """Write assessment cache entries as JSON lines"""
+        try:
+            with open(self.assessment_cache_file, mode, encoding='utf-8') as f:
+                f.write(''.join(
+                    _encode_state({'key': key, 'at': at, 'result': [v, e, c, int(p)]}) + '\n'
+                    for key, (at, (v, e, c, p)) in entries.items()
+                ))
+        except Exception as e:
+            print(f"⚠️ Assessment cache save failed: {e}")
     
     def should_work_now(self) -> bool:
         """Determine if there's valuable work to do right now"""
@@ -227,51 +467,35 @@ class AgenticWorkManager:
         if not self.work_queue:
             return None
         
-        # Filter by budget and dependencies
+        # Single pass: filter by budget and dependencies, keep the best score
         remaining_budget = self.cost_tracker.get_remaining_budget()
-        available_work = [
-            w for w in self.work_queue
-            if w.estimated_cost <= remaining_budget
-            and self._dependencies_satisfied(w)
-        ]
-        
-        if not available_work:
-            return None
-        
-        # Sort by value score and priority
-        priority_weights = {
-            WorkPriority.URGENT: 1000,
-            WorkPriority.HIGH: 100,
-            WorkPriority.MEDIUM: 10,
-            WorkPriority.LOW: 1,
-            WorkPriority.MAINTENANCE: 0.1
-        }
-        
-        def score_work(work: WorkItem) -> float:
-            priority_weight = priority_weights.get(work.priority, 1)
-            return work.value_score * priority_weight
+        best_work = None
+        best_score = 0.0
+        with self._state_lock:
+            # Dependency check inlined as one C-level subset test per item
+            deps_done = self._completed_ids.issuperset
+            for work in self.work_queue:
+                if work.estimated_cost > remaining_budget:
+                    continue
+                if work.dependencies and not deps_done(work.dependencies):
+                    continue
+                
+                # Score by value and priority
+                score = work.value_score * _PRIORITY_WEIGHTS[work.priority]
+                if best_work is None or score > best_score:
+                    best_work, best_score = work, score
         
-        return max(available_work, key=score_work)
+        return best_work
     
     def execute_work_item(self, work: WorkItem) -> Dict[str, Any]:
         """Execute a work item using appropriate workflow"""
         print(f"🚀 Executing work: {work.description}")
-        self.active_work = work
+        with self._state_lock:
+            self.active_work = work
         
         try:
             # Map work type to workflow
-            workflow_mapping = {
-                WorkType.BUG_FIX: 'bug_fix',
-                WorkType.CODE_REVIEW: 'analyze',
-                WorkType.OPTIMIZATION: 'refactor',
-                WorkType.DOCUMENTATION: 'analyze',  # Will generate docs
-                WorkType.TESTING: 'generate',       # Will generate tests
-                WorkType.REFACTORING: 'refactor',
-                WorkType.SECURITY_AUDIT: 'analyze',
-                WorkType.PERFORMANCE_ANALYSIS: 'analyze'
-            }
-            
-            workflow_type = workflow_mapping.get(work.type, 'analyze')
+            workflow_type = _WORKFLOW_MAP.get(work.type, 'analyze')
             
             # Execute using progressive executor
             result = self.executor.execute_with_escalation(
@@ -282,13 +506,24 @@ class AgenticWorkManager:
             
             # Mark as completed
             work.completed_at = datetime.now()
-            self.completed_work.append(work)
-            self.work_queue.remove(work)
-            self.active_work = None
-            
-            self._save_state()
+            with self._state_lock:
+                evicted = None
+                if len(self.completed_work) == self.completed_work.maxlen:
+                    evicted = self.completed_work[0]
+                    self._append_archive([evicted.to_dict()])
+                self.completed_work.append(work)
+                self._completed_ids.add(work.id)
+                self.work_queue.remove(work)
+                self.active_work = None
+                
+                self._append_state(self.work_queue_file, 'remove', [work])
+                if evicted is not None:
+                    # Archived now, so drop it from the log rather than wait for compaction
+                    self._append_state(self.completed_work_file, 'remove', [evicted])
+                self._append_state(self.completed_work_file, 'add', [work])
             
             print(f"✅ Completed work: {work.description}")
+            self._notify_wakeup()
             return {
                 'success': result.success,
                 'work_item': work,
@@ -299,32 +534,50 @@ class AgenticWorkManager:
             
         except Exception as e:
             print(f"❌ Work execution failed: {e}")
-            self.active_work = None
+            with self._state_lock:
+                self.active_work = None
             return {
                 'success': False,
                 'work_item': work,
                 'error': str(e)
             }
     
-    def run_continuous_agent(self, max_iterations: int = 100):
+    def run_continuous_agent(self, max_iterations: int = 100, cost_flush_interval: int = 10):
         """Run continuous agentic operation"""
         print("🤖 Starting continuous agentic operation")
         
+        # Coalesce cost log writes across iterations instead of writing per task
+        previous_flush_interval = self.cost_tracker.flush_interval
+        self.cost_tracker.flush_interval = cost_flush_interval
+        self._scan_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="atlas-scan")
+        try:
+            self._run_agent_loop(max_iterations)
+        finally:
+            self._scan_pool.shutdown(wait=False, cancel_futures=True)
+            self._scan_pool = None
+            self.cost_tracker.flush_interval = previous_flush_interval
+            self.cost_tracker.flush()
+            self._compact_state()
+    
+    def _run_agent_loop(self, max_iterations: int):
+        """Main agent loop: scan, execute, sleep"""
         iteration = 0
         last_scan = 0
+        pending_scan: Optional[Future] = None
         
         while iteration < max_iterations:
             current_time = time.time()
             
-            # Periodic work detection
-            if current_time - last_scan > self.scan_interval:
-                opportunities = self.detect_work_opportunities()
-                for opp in opportunities:
-                    if len(self.work_queue) < self.max_work_queue_size:
-                        self.work_queue.append(opp)
-                
+            # Periodic work detection in the background
+            if pending_scan is None and current_time - last_scan > self.scan_interval:
+                pending_scan = self._scan_pool.submit(self.detect_work_opportunities)
+                pending_scan.add_done_callback(lambda _: self._notify_wakeup())
                 last_scan = current_time
-                self._save_state()
+            
+            # Drain a finished scan into the queue without blocking
+            if pending_scan is not None and pending_scan.done():
+                self._enqueue_opportunities(pending_scan.result())
+                pending_scan = None
             
             # Execute work if valuable work is available
             if self.should_work_now():
@@ -340,37 +593,81 @@ class AgenticWorkManager:
                 print("💰 Daily budget exhausted, stopping agent")
                 break
             
-            # Sleep before next iteration
-            time.sleep(60)  # 1 minute between checks
+            # Wait up to a minute, or until new work may be ready
+            self._wait_for_wakeup(60)
             iteration += 1
         
         print(f"🏁 Agent completed {iteration} iterations")
     
+    def _notify_wakeup(self):
+        """Signal the agent loop to re-check for work"""
+        with self._wakeup:
+            self._wakeup_pending = True
+            self._wakeup.notify_all()
+    
+    def _wait_for_wakeup(self, timeout: float):
+        """Block until notified or timeout, consuming any pending signal"""
+        with self._wakeup:
+            self._wakeup.wait_for(lambda: self._wakeup_pending, timeout=timeout)
+            self._wakeup_pending = False
+    
+    def _enqueue_opportunities(self, opportunities: List[WorkItem]):
+        """Add scanned opportunities to the work queue up to its size limit"""
+        with self._state_lock:
+            queued = []
+            for opp in opportunities:
+                if len(self.work_queue) < self.max_work_queue_size:
+                    self.work_queue.append(opp)
+                    queued.append(opp)
+            
+            if queued:
+                self._append_state(self.work_queue_file, 'add', queued)
+    
+    def _cached_context(self, name: str, key: Any, build) -> str:
+        """Return the cached value for name if key still matches, else rebuild it"""
+        cached = self._ctx_cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        value = build()
+        self._ctx_cache[name] = (key, value)
+        return value
+    
+    def _scan_window(self) -> int:
+        """Identify the current scan window; values cached per window expire with it"""
+        if self.scan_interval <= 0:
+            # No interval means always rescan: every call gets a window of its own
+            return time.monotonic_ns()
+        return int(time.time() // self.scan_interval)
+    
     def _analyze_project_state(self) -> str:
         """Analyze current project state"""
+        return self._cached_context('project_state', self._scan_window(), self._build_project_state)
+    
+    def _build_project_state(self) -> str:
+        """Gather git status, file structure and recent errors"""
         state_info = []
         
         # Git status
-        try:
-            git_status = subprocess.run(
-                ['git', 'status', '--porcelain'],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if git_status.returncode == 0:
-                state_info.append(f"Git status: {git_status.stdout}")
-        except:
+        status, _ = self._git_state()
+        if status is not None:
+            state_info.append(f"Git status: {status}")
+        else:
             state_info.append("Git status: Unable to determine")
         
-        # File structure
+        # File structure - one directory read, bucketed so .py files list first
         try:
-            important_files = []
-            for pattern in ['*.py', '*.js', '*.ts', '*.md', '*.txt']:
-                important_files.extend(self.project_root.glob(pattern))
+            buckets: Dict[str, List[str]] = {ext: [] for ext in _IMPORTANT_EXTENSIONS}
+            with os.scandir(self.project_root) as entries:
+                for entry in entries:
+                    bucket = buckets.get(os.path.splitext(entry.name)[1])
+                    if bucket is not None and entry.is_file():
+                        bucket.append(entry.name)
+                        if len(buckets['.py']) >= 10:
+                            break
             
-            state_info.append(f"Files: {[f.name for f in important_files[:10]]}")
+            important_files = [name for ext in _IMPORTANT_EXTENSIONS for name in buckets[ext]]
+            state_info.append(f"Files: {important_files[:10]}")
         except:
             state_info.append("Files: Unable to scan")
         
@@ -378,8 +675,7 @@ class AgenticWorkManager:
         error_log = self.project_root / "last_error.log"
         if error_log.exists():
             try:
-                with open(error_log, 'r') as f:
-                    error_content = f.read()[-500:]  # Last 500 chars
+                error_content = _tail_text(error_log, 500)  # Last 500 chars
                 state_info.append(f"Recent errors: {error_content}")
             except:
                 pass
@@ -388,45 +684,59 @@ class AgenticWorkManager:
     
     def _get_recent_changes(self) -> str:
         """Get recent changes to the project"""
-        try:
-            # Git log for recent commits
-            git_log = subprocess.run(
-                ['git', 'log', '--oneline', '-5'],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if git_log.returncode == 0:
-                return f"Recent commits:\n{git_log.stdout}"
-        except:
-            pass
+        return self._cached_context('recent_changes', self._scan_window(), self._build_recent_changes)
+    
+    def _build_recent_changes(self) -> str:
+        """Summarize recent commits"""
+        _, log = self._git_state()
+        if log is not None:
+            return f"Recent commits:\n{log}"
         
         return "No recent changes detected"
     
+    def _git_state(self) -> Tuple[Optional[str], Optional[str]]:
+        """Porcelain status and last five commits, shared by state and change summaries"""
+        return self._cached_context('git_state', self._scan_window(), self._read_git_state)
+    
+    def _read_git_state(self) -> Tuple[Optional[str], Optional[str]]:
+        """Read git state in-process via pygit2 when available, else via the git CLI"""
+        return read_git_state(self.project_root)
+    
     def _get_project_context(self) -> str:
         """Get project context and goals"""
-        context_sources = []
-        
-        # README
         readme_files = list(self.project_root.glob("README*"))
-        if readme_files:
+        readme = readme_files[0] if readme_files else None
+        claude_md = self.project_root / "CLAUDE.md"
+        
+        # Valid until either file is created, removed or modified
+        key = []
+        for path in (readme, claude_md):
             try:
-                with open(readme_files[0], 'r') as f:
-                    readme_content = f.read()[:1000]  # First 1000 chars
-                context_sources.append(f"README: {readme_content}")
-            except:
-                pass
+                key.append((path.name, path.stat().st_mtime))
+            except (AttributeError, OSError):
+                key.append(None)
         
-        # CLAUDE.md if it exists
-        claude_md = self.project_root / "CLAUDE.md"
-        if claude_md.exists():
+        return self._cached_context(
+            'project_context', tuple(key),
+            lambda: self._build_project_context(readme, claude_md)
+        )
+    
+    def _build_project_context(self, readme: Optional[Path], claude_md: Path) -> str:
+        """Read project context from README and CLAUDE.md"""
+        context_sources = []
+        
+        # README (first 1000 chars) and CLAUDE.md (first 500) are read concurrently
+        pool = _get_context_read_pool()
+        pending = []
+        if readme:
+            pending.append(("README", pool.submit(_head_text, readme, 1000)))
+        pending.append(("CLAUDE.md", pool.submit(_head_text, claude_md, 500)))
+        
+        for label, future in pending:
             try:
-                with open(claude_md, 'r') as f:
-                    claude_content = f.read()[:500]
-                context_sources.append(f"CLAUDE.md: {claude_content}")
-            except:
-                pass
+                context_sources.append(f"{label}: {future.result()}")
+            except OSError:
+                pass  # Missing or unreadable
         
         if not context_sources:
             context_sources.append("Project context: Atlas Coder DSPy development")
@@ -442,24 +752,19 @@ class AgenticWorkManager:
         
         try:
             # Simple parsing - in real implementation would be more sophisticated
-            opp_lines = opportunities.split('\n')
+            scan_time = int(time.time())
+            candidates = [
+                (f"work_{scan_time}_{i}", description)
+                for i, description in enumerate(self._iter_opp_descriptions(opportunities))
+            ]
             
-            for i, line in enumerate(opp_lines):
-                if line.strip() and not line.startswith('-'):
-                    continue
-                
-                # Create work item
-                work_id = f"work_{int(time.time())}_{i}"
-                description = line.strip('- ').strip()
-                
-                if len(description) < 10:  # Skip very short descriptions
-                    continue
-                
-                # Assess this opportunity
-                value_score, effort, cost, priority = self.assess_work_value(
-                    description, WorkType.CODE_REVIEW  # Default type
-                )
-                
+            if not candidates:
+                return work_items
+            
+            # Assess all opportunities in one batch
+            assessments = self.assess_work_values([description for _, description in candidates])
+            
+            for (work_id, description), (value_score, effort, cost, priority) in zip(candidates, assessments):
                 if value_score >= self.min_value_threshold:
                     work_item = WorkItem(
                         id=work_id,
@@ -481,24 +786,35 @@ class AgenticWorkManager:
         
         return work_items
     
+    def _iter_opp_descriptions(self, opportunities: str):
+        """Yield descriptions from bulleted opportunity lines"""
+        for line in opportunities.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('-'):
+                description = stripped.strip('- ')
+                if len(description) >= 10:  # Skip very short descriptions
+                    yield description
+    
     def _parse_effort(self, effort_str: str) -> float:
         """Parse effort estimate from string"""
+        if not effort_str:
+            return 30.0
         try:
-            # Extract numbers from string
-            import re
-            numbers = re.findall(r'\d+', effort_str)
-            if numbers:
-                return float(numbers[0])
+            # First number in the string
+            match = _EFFORT_RE.search(effort_str)
+            if match:
+                return float(match.group())
         except:
             pass
         return 30.0  # Default 30 minutes
     
     def _parse_cost(self, cost_str: str) -> float:
         """Parse cost estimate from string"""
+        if not cost_str:
+            return 0.02
         try:
-            import re
             # Look for dollar amounts
-            dollar_match = re.search(r'\$?(\d+\.?\d*)', cost_str)
+            dollar_match = _COST_RE.search(cost_str)
             if dollar_match:
                 return float(dollar_match.group(1))
         except:
@@ -524,48 +840,165 @@ class AgenticWorkManager:
         if not work.dependencies:
             return True
         
-        completed_ids = {w.id for w in self.completed_work}
-        return all(dep_id in completed_ids for dep_id in work.dependencies)
+        return self._completed_ids.issuperset(work.dependencies)
     
     def _load_state(self):
-        """Load work queue and completed work from disk"""
+        """Load work queue and completed work by replaying their logs"""
         try:
-            if self.work_queue_file.exists():
-                with open(self.work_queue_file, 'r') as f:
-                    queue_data = json.load(f)
-                    self.work_queue = [WorkItem.from_dict(item) for item in queue_data]
-            
-            if self.completed_work_file.exists():
-                with open(self.completed_work_file, 'r') as f:
-                    completed_data = json.load(f)
-                    self.completed_work = [WorkItem.from_dict(item) for item in completed_data]
-                    
+            self.work_queue = [WorkItem.from_dict(item) for item in self._replay_log(self.work_queue_file)]
+            self._set_completed_work(self._replay_log(self.completed_work_file))
         except Exception as e:
             print(f"⚠️ State load failed: {e}")
+            return
+        
+        # Migrate state written by the old full-rewrite JSON format
+        legacy_files = [
+            self.work_queue_file.with_suffix('.json'),
+            self.completed_work_file.with_suffix('.json')
+        ]
+        if any(f.exists() for f in legacy_files):
+            self._load_legacy_state(*legacy_files)
+        
+        self._completed_ids = self._archived_ids()
+        self._completed_ids.update(w.id for w in self.completed_work)
     
-    def _save_state(self):
-        """Save work queue and completed work to disk"""
+    def _set_completed_work(self, items: List[Dict[str, Any]]):
+        """Keep the most recent completions in memory and archive the rest"""
+        # Only the retained window is turned into WorkItems; overflow is archived as-is
+        overflow = len(items) - self.completed_history_limit
+        self.completed_work = deque(
+            (WorkItem.from_dict(item) for item in items[max(overflow, 0):]),
+            maxlen=self.completed_history_limit
+        )
+        if overflow > 0:
+            # Entries already archived (e.g. evicted just before a crash) are not archived twice
+            archived = self._archived_ids()
+            self._append_archive([item for item in items[:overflow] if item['id'] not in archived])
+            # Rewrite the log right away so the archived entries are not replayed again
+            self._compact_state()
+    
+    def _archive_file(self) -> Path:
+        """Archive log for completions evicted this month"""
+        return self.state_dir / f"completed_archive_{datetime.now():%Y%m}.jsonl"
+    
+    def _append_archive(self, items: List[Dict[str, Any]]):
+        """Append evicted completions to the monthly archive"""
+        if not items:
+            return
         try:
-            with open(self.work_queue_file, 'w') as f:
-                queue_data = [item.to_dict() for item in self.work_queue]
-                json.dump(queue_data, f, indent=2)
+            with open(self._archive_file(), 'a', encoding='utf-8') as f:
+                f.write(''.join(
+                    _encode_state({'op': 'add', 'item': item}) + '\n'
+                    for item in items
+                ))
+        except Exception as e:
+            print(f"⚠️ Archive save failed: {e}")
+    
+    def _archived_ids(self) -> Set[str]:
+        """Ids of archived completions, so old dependencies stay satisfied"""
+        ids: Set[str] = set()
+        for path in self.state_dir.glob("completed_archive_*.jsonl"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            ids.add(json.loads(line)['item']['id'])
+            except Exception as e:
+                print(f"⚠️ Archive load failed: {e}")
+        return ids
+    
+    def _replay_log(self, path: Path) -> List[Dict[str, Any]]:
+        """Replay an append-only log into the serialized items still present"""
+        # Items stay as parsed dicts so removed entries never pay for WorkItem construction
+        items: Dict[str, Dict[str, Any]] = {}
+        if not path.exists():
+            return []
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry['op'] == 'add':
+                    item = entry['item']
+                    items[item['id']] = item
+                elif entry['op'] == 'remove':
+                    items.pop(entry['id'], None)
+        
+        return list(items.values())
+    
+    def _load_legacy_state(self, legacy_queue: Path, legacy_completed: Path):
+        """Import old-format JSON state files and rewrite them as logs"""
+        try:
+            if legacy_queue.exists() and not self.work_queue:
+                with open(legacy_queue, 'r') as f:
+                    self.work_queue = [WorkItem.from_dict(item) for item in json.load(f)]
+            
+            if legacy_completed.exists() and not self.completed_work:
+                with open(legacy_completed, 'r') as f:
+                    self._set_completed_work(json.load(f))
             
-            with open(self.completed_work_file, 'w') as f:
-                completed_data = [item.to_dict() for item in self.completed_work]
-                json.dump(completed_data, f, indent=2)
+            self._compact_state()
+            for legacy_file in (legacy_queue, legacy_completed):
+                legacy_file.unlink(missing_ok=True)
                 
+        except Exception as e:
+            print(f"⚠️ Legacy state migration failed: {e}")
+    
+    def _append_state(self, path: Path, op: str, items: List[WorkItem]):
+        """Append add/remove entries for items to a state log in one write"""
+        if op == 'add':
+            entries = [{'op': 'add', 'item': item.to_dict()} for item in items]
+        else:
+            entries = [{'op': 'remove', 'id': item.id} for item in items]
+        
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(''.join(_encode_state(entry) + '\n' for entry in entries))
         except Exception as e:
             print(f"⚠️ State save failed: {e}")
+            return
+        
+        self._appends_since_compact += len(entries)
+        if self._appends_since_compact >= self.compact_every:
+            self._compact_state()
+    
+    def _compact_state(self):
+        """Rewrite each log as a snapshot of the current state"""
+        with self._state_lock:
+            self._write_snapshots()
+    
+    def _write_snapshots(self):
+        """Write the queue and completed work as compacted logs"""
+        try:
+            for path, items in ((self.work_queue_file, self.work_queue),
+                                (self.completed_work_file, self.completed_work)):
+                tmp_path = path.with_suffix('.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(''.join(
+                        _encode_state({'op': 'add', 'item': item.to_dict()}) + '\n'
+                        for item in items
+                    ))
+                os.replace(tmp_path, path)
+            self._appends_since_compact = 0
+                
+        except Exception as e:
+            print(f"⚠️ State save failed: {e}")
+    
+    def _save_state(self):
+        """Save work queue and completed work to disk"""
+        self._compact_state()
     
     def get_agent_status(self) -> Dict[str, Any]:
         """Get current agent status"""
         return {
             'work_queue_size': len(self.work_queue),
-            'completed_work_count': len(self.completed_work),
+            'completed_work_count': len(self._completed_ids),
             'active_work': self.active_work.description if self.active_work else None,
             'remaining_budget': self.cost_tracker.get_remaining_budget(),
             'high_value_work_available': len([w for w in self.work_queue if w.value_score > self.min_value_threshold]),
             'next_scan_in': max(0, self.scan_interval - (time.time() % self.scan_interval))
+                            if self.scan_interval > 0 else 0
         }
 
 # Convenience functions
@@ -586,10 +1019,16 @@ def get_agent_status(project_root: str = ".") -> Dict[str, Any]:
 
 # Global instance
 _agentic_manager = None
+_agentic_manager_lock = threading.Lock()
 
 def get_agentic_manager() -> AgenticWorkManager:
     """Get global agentic work manager"""
     global _agentic_manager
-    if _agentic_manager is None:
-        _agentic_manager = AgenticWorkManager()
-    return _agentic_manager
\ No newline at end of file
+    manager = _agentic_manager
+    if manager is None:
+        # Double-checked so concurrent first calls build a single manager
+        with _agentic_manager_lock:
+            if _agentic_manager is None:
+                _agentic_manager = AgenticWorkManager()
+            manager = _agentic_manager
+    return manager
\ No newline at end of file
@@ -4,13 +4,18 @@ Meta-programming: accelerate development using systematic programming
 """
 
 import dspy
+import asyncio
 import time
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from pathlib import Path
+from types import MappingProxyType
 import ast
 import json
+import threading
 
 from .signatures import *
+from .cache import get_signature_cache, active_model_name
 
 # Bootstrap-specific signatures for self-development
 class AnalyzeFeatureRequest(dspy.Signature):
@@ -50,6 +55,79 @@ class ArchitectureEvolution(dspy.Signature):
     migration_plan = dspy.OutputField(desc="Plan for migrating to new architecture")
     risk_assessment = dspy.OutputField(desc="Risks and mitigation strategies")
 
+# Architecture and pattern context shared by every bootstrap instance
+@lru_cache(maxsize=1)
+def _arch_doc() -> str:
+    """Current Atlas Coder architecture description"""
+    architecture_doc = """
+        Atlas Coder DSPy Architecture:
+        
+        Core Components:
+        - dspy_core/signatures.py: Declarative behavior definitions
+        - dspy_core/modules.py: Composable programming modules  
+        - dspy_core/workflows.py: Complete development workflows
+        - dspy_core/engine.py: Model management and optimization
+        - dspy_core/cache.py: Smart caching for efficiency
+        - dspy_core/optimization.py: Cost and token optimization
+        - dspy_core/model_strategy.py: Hybrid model selection
+        - dspy_core/progressive_execution.py: Escalating complexity
+        
+        Key Patterns:
+        - Signature-first design: Define behavior declaratively
+        - Module composition: Combine simple modules for complex workflows
+        - Progressive complexity: Start simple, escalate as needed
+        - Cost optimization: Minimize API usage while maximizing quality
+        - Model flexibility: Seamless local/API model switching
+        - Caching strategy: Smart caching for 80%+ efficiency gains
+        
+        Current Capabilities:
+        - Bug fixing with systematic diagnosis
+        - Code generation from requirements
+        - Code analysis and quality review
+        - Complete project generation
+        - Code refactoring and improvement
+        - Real-time cost tracking and budget management
+        """
+    return architecture_doc
+
+@lru_cache(maxsize=1)
+def _patterns_doc() -> str:
+    """Existing code patterns to follow for consistency"""
+    patterns = """
+        Existing Code Patterns:
+        
+        1. DSPy Module Structure:
+           - Inherit from dspy.Module
+           - Initialize signatures in __init__
+           - Implement forward() method with clear logic flow
+           - Return dspy.Prediction with structured output
+        
+        2. Signature Definitions:
+           - Use descriptive field names
+           - Include comprehensive field descriptions
+           - Structure input/output for clear data flow
+           - Follow naming convention: ActionTarget format
+        
+        3. Workflow Organization:
+           - Extend BaseWorkflow for consistency
+           - Implement _setup_modules() and execute() methods
+           - Return WorkflowResult with success/data/error
+           - Handle exceptions gracefully with error reporting
+        
+        4. Cost Optimization:
+           - Token usage minimization
+           - Progressive complexity escalation  
+           - Smart caching integration
+           - Budget tracking and limits
+        
+        5. Model Selection:
+           - Prefer local models when available
+           - Escalate to API models based on complexity/quality needs
+           - Track performance for future optimization
+           - Maintain fallback chains for reliability
+        """
+    return patterns
+
 class AtlasCoderBootstrap(dspy.Module):
     """Use DSPy to accelerate Atlas Coder development"""
     
@@ -61,11 +139,30 @@ class AtlasCoderBootstrap(dspy.Module):
         self.evolve_architecture = dspy.ChainOfThought(ArchitectureEvolution)
         
         # Load current architecture context
-        self.current_architecture = self._load_current_architecture()
-        self.existing_patterns = self._analyze_existing_patterns()
+        self.current_architecture = _arch_doc()
+        self.existing_patterns = _patterns_doc()
+    
+    def forward(self, feature_description: str) -> Dict[str, Any]:
+        """Module entry point, so features can be bootstrapped with batch()"""
+        return self.bootstrap_feature(feature_description)
     
     def bootstrap_feature(self, feature_description: str) -> Dict[str, Any]:
-        """Generate new Atlas Coder features using DSPy"""
+        """Generate new Atlas Coder features using DSPy, reusing results for repeat descriptions"""
+        cache = get_signature_cache()
+        inputs = {'feature_description': feature_description}
+        model = active_model_name()
+        
+        cached = cache.get("bootstrap_feature", inputs, model)
+        if cached is not None:
+            return cached
+        
+        start_time = time.time()
+        result = self._bootstrap_feature_uncached(feature_description)
+        cache.put("bootstrap_feature", inputs, result, model, time.time() - start_time)
+        return result
+    
+    def _bootstrap_feature_uncached(self, feature_description: str) -> Dict[str, Any]:
+        """Run the analyze, generate and optimize chain for a feature"""
         print(f"🚀 Bootstrapping feature: {feature_description}")
         
         # Step 1: Analyze feature requirements
@@ -141,19 +238,24 @@ class AtlasCoderBootstrap(dspy.Module):
     
     def generate_module_variations(self, 
                                   base_module: str,
-                                  optimization_targets: List[str]) -> Dict[str, Any]:
+                                  optimization_targets: List[str],
+                                  max_concurrency: int = 8) -> Dict[str, Any]:
         """Generate optimized variations of existing modules"""
         variations = {}
         
-        for target in optimization_targets:
-            print(f"🎯 Optimizing for: {target}")
-            
-            optimization = self.optimize_composition(
-                modules=base_module,
-                workflow_requirements=f"Optimize for {target}",
-                cost_constraints="Maintain current cost efficiency"
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Targets are independent LLM calls, so run them concurrently
+            optimizations = asyncio.run(
+                self._optimize_for_targets(base_module, optimization_targets, max_concurrency)
             )
-            
+        else:
+            # asyncio.run() can't be nested inside the caller's event loop
+            optimizations = [self._optimize_for_target(base_module, target)
+                             for target in optimization_targets]
+        
+        for target, optimization in zip(optimization_targets, optimizations):
             variations[target] = {
                 'optimized_code': optimization.optimized_composition,
                 'improvements': optimization.performance_improvements,
@@ -162,75 +264,26 @@ class AtlasCoderBootstrap(dspy.Module):
         
         return variations
     
-    def _load_current_architecture(self) -> str:
-        """Load current Atlas Coder architecture description"""
-        architecture_doc = """
-        Atlas Coder DSPy Architecture:
-        
-        Core Components:
-        - dspy_core/signatures.py: Declarative behavior definitions
-        - dspy_core/modules.py: Composable programming modules  
-        - dspy_core/workflows.py: Complete development workflows
-        - dspy_core/engine.py: Model management and optimization
-        - dspy_core/cache.py: Smart caching for efficiency
-        - dspy_core/optimization.py: Cost and token optimization
-        - dspy_core/model_strategy.py: Hybrid model selection
-        - dspy_core/progressive_execution.py: Escalating complexity
-        
-        Key Patterns:
-        - Signature-first design: Define behavior declaratively
-        - Module composition: Combine simple modules for complex workflows
-        - Progressive complexity: Start simple, escalate as needed
-        - Cost optimization: Minimize API usage while maximizing quality
-        - Model flexibility: Seamless local/API model switching
-        - Caching strategy: Smart caching for 80%+ efficiency gains
-        
-        Current Capabilities:
-        - Bug fixing with systematic diagnosis
-        - Code generation from requirements
-        - Code analysis and quality review
-        - Complete project generation
-        - Code refactoring and improvement
-        - Real-time cost tracking and budget management
-        """
-        return architecture_doc
+    def _optimize_for_target(self, base_module: str, target: str) -> Any:
+        """Run the composition optimizer for one target"""
+        print(f"🎯 Optimizing for: {target}")
+        return self.optimize_composition(
+            modules=base_module,
+            workflow_requirements=f"Optimize for {target}",
+            cost_constraints="Maintain current cost efficiency"
+        )
     
-    def _analyze_existing_patterns(self) -> str:
-        """Analyze existing code patterns for consistency"""
-        patterns = """
-        Existing Code Patterns:
-        
-        1. DSPy Module Structure:
-           - Inherit from dspy.Module
-           - Initialize signatures in __init__
-           - Implement forward() method with clear logic flow
-           - Return dspy.Prediction with structured output
+    async def _optimize_for_targets(self, base_module: str, optimization_targets: List[str],
+                                    max_concurrency: int) -> List[Any]:
+        """Run one composition optimization per target, at most max_concurrency at a time"""
+        optimize = dspy.asyncify(self._optimize_for_target)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
         
-        2. Signature Definitions:
-           - Use descriptive field names
-           - Include comprehensive field descriptions
-           - Structure input/output for clear data flow
-           - Follow naming convention: ActionTarget format
+        async def bounded(target: str) -> Any:
+            async with semaphore:
+                return await optimize(base_module, target)
         
-        3. Workflow Organization:
-           - Extend BaseWorkflow for consistency
-           - Implement _setup_modules() and execute() methods
-           - Return WorkflowResult with success/data/error
-           - Handle exceptions gracefully with error reporting
-        
-        4. Cost Optimization:
-           - Token usage minimization
-           - Progressive complexity escalation  
-           - Smart caching integration
-           - Budget tracking and limits
-        
-        5. Model Selection:
-           - Prefer local models when available
-           - Escalate to API models based on complexity/quality needs
-           - Track performance for future optimization
-           - Maintain fallback chains for reliability
-        """
-        return patterns
+        return await asyncio.gather(*(bounded(target) for target in optimization_targets))
     
     def _summarize_usage_patterns(self, usage_data: Dict[str, Any]) -> str:
         """Summarize usage patterns for architecture evolution"""
@@ -253,51 +306,51 @@ class AtlasCoderBootstrap(dspy.Module):
         """
         return summary
 
+# (metric, threshold, opportunity) checked in order: performance bottlenecks,
+# cost efficiency, quality consistency
+IMPROVEMENT_RULES = (
+    ('avg_execution_time', 30, MappingProxyType({
+        'type': 'performance',
+        'description': 'Reduce average execution time',
+        'priority': 'high',
+        'estimated_impact': 'Faster user experience'
+    })),
+    ('cost_per_task', 0.02, MappingProxyType({
+        'type': 'cost',
+        'description': 'Optimize cost per task',
+        'priority': 'medium',
+        'estimated_impact': 'Better budget utilization'
+    })),
+    ('quality_variance', 0.2, MappingProxyType({
+        'type': 'quality',
+        'description': 'Improve quality consistency',
+        'priority': 'high',
+        'estimated_impact': 'More reliable results'
+    })),
+)
+
 class SelfImprovementEngine(dspy.Module):
     """Continuous self-improvement for Atlas Coder"""
     
     def __init__(self):
         super().__init__()
-        self.bootstrap = AtlasCoderBootstrap()
-        self.improvement_log = Path("./dspy_cache/improvements.json")
+        self.bootstrap = get_bootstrap()
+        self.improvement_log = Path("./dspy_cache/improvements.jsonl")
         self.improvement_log.parent.mkdir(exist_ok=True)
+        self._migrate_legacy_log(self.improvement_log.with_suffix('.json'))
     
     def identify_improvement_opportunities(self, 
                                         performance_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Identify areas for system improvement"""
-        opportunities = []
-        
-        # Analyze performance bottlenecks
-        if performance_data.get('avg_execution_time', 0) > 30:
-            opportunities.append({
-                'type': 'performance',
-                'description': 'Reduce average execution time',
-                'priority': 'high',
-                'estimated_impact': 'Faster user experience'
-            })
-        
-        # Analyze cost efficiency
-        if performance_data.get('cost_per_task', 0) > 0.02:
-            opportunities.append({
-                'type': 'cost',
-                'description': 'Optimize cost per task',
-                'priority': 'medium',
-                'estimated_impact': 'Better budget utilization'
-            })
-        
-        # Analyze quality consistency
-        if performance_data.get('quality_variance', 0) > 0.2:
-            opportunities.append({
-                'type': 'quality',
-                'description': 'Improve quality consistency',
-                'priority': 'high',
-                'estimated_impact': 'More reliable results'
-            })
-        
-        return opportunities
+        return [
+            dict(opportunity)
+            for metric, threshold, opportunity in IMPROVEMENT_RULES
+            if performance_data.get(metric, 0) > threshold
+        ]
     
     def generate_improvement_plan(self, 
-                                opportunities: List[Dict[str, Any]]) -> Dict[str, Any]:
+                                opportunities: List[Dict[str, Any]],
+                                num_threads: int = 8) -> Dict[str, Any]:
         """Generate actionable improvement plan"""
         plan = {
             'high_priority': [],
@@ -307,9 +360,23 @@ class SelfImprovementEngine(dspy.Module):
             'estimated_effort': {}
         }
         
-        for opp in opportunities:
+        # Bootstrap every opportunity in parallel; results come back in input order
+        examples = [
+            dspy.Example(feature_description=opp['description']).with_inputs('feature_description')
+            for opp in opportunities
+        ]
+        try:
+            improvement_features = self.bootstrap.batch(
+                examples, num_threads=max(1, min(num_threads, len(examples)))
+            ) if examples else []
+        except Exception as e:
+            improvement_features = [{'error': f'Bootstrap failed: {e}'} for _ in opportunities]
+        
+        for opp, improvement_feature in zip(opportunities, improvement_features):
             priority = opp['priority']
-            improvement_feature = self.bootstrap.bootstrap_feature(opp['description'])
+            if improvement_feature is None:
+                # batch() yields None for examples that raised
+                improvement_feature = {'error': 'Bootstrap failed'}
             
             plan[f"{priority}_priority"].append({
                 'opportunity': opp,
@@ -327,36 +394,47 @@ class SelfImprovementEngine(dspy.Module):
     def save_improvement(self, improvement: Dict[str, Any]):
         """Save improvement for tracking"""
         try:
-            improvements = []
-            if self.improvement_log.exists():
-                with open(self.improvement_log, 'r') as f:
-                    improvements = json.load(f)
-            
-            improvements.append({
+            # One JSON line per improvement; history is never re-read to append
+            entry = {
                 'timestamp': time.time(),
                 'improvement': improvement
-            })
+            }
             
-            with open(self.improvement_log, 'w') as f:
-                json.dump(improvements, f, indent=2)
+            with open(self.improvement_log, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
                 
         except Exception as e:
             print(f"⚠️ Could not save improvement: {e}")
+    
+    def _migrate_legacy_log(self, legacy_log: Path):
+        """Move entries from the old single-array JSON log into the JSONL log"""
+        if not legacy_log.exists():
+            return
+        try:
+            with open(legacy_log, 'r') as f:
+                improvements = json.load(f)
+            
+            with open(self.improvement_log, 'a') as f:
+                f.write(''.join(json.dumps(entry) + '\n' for entry in improvements))
+            legacy_log.unlink()
+            
+        except Exception as e:
+            print(f"⚠️ Could not migrate improvement log: {e}")
 
 # Convenience functions
 def bootstrap_new_feature(feature_description: str) -> Dict[str, Any]:
     """Bootstrap a new feature using DSPy"""
-    bootstrap = AtlasCoderBootstrap()
+    bootstrap = get_bootstrap()
     return bootstrap.bootstrap_feature(feature_description)
 
 def evolve_architecture(usage_data: Dict[str, Any], new_requirements: List[str]) -> Dict[str, Any]:
     """Evolve system architecture based on usage"""
-    bootstrap = AtlasCoderBootstrap()
+    bootstrap = get_bootstrap()
     return bootstrap.evolve_system_architecture(usage_data, new_requirements)
 
 def self_improve(performance_data: Dict[str, Any]) -> Dict[str, Any]:
     """Run self-improvement analysis"""
-    engine = SelfImprovementEngine()
+    engine = get_self_improvement()
     opportunities = engine.identify_improvement_opportunities(performance_data)
     plan = engine.generate_improvement_plan(opportunities)
     return {
@@ -367,17 +445,29 @@ def self_improve(performance_data: Dict[str, Any]) -> Dict[str, Any]:
 # Global instances
 _bootstrap = None
 _self_improvement = None
+_bootstrap_lock = threading.Lock()
+_self_improvement_lock = threading.Lock()
 
 def get_bootstrap() -> AtlasCoderBootstrap:
     """Get global bootstrap instance"""
     global _bootstrap
-    if _bootstrap is None:
-        _bootstrap = AtlasCoderBootstrap()
-    return _bootstrap
+    bootstrap = _bootstrap
+    if bootstrap is None:
+        # Double-checked so concurrent first calls (e.g. batch workers) build a single instance
+        with _bootstrap_lock:
+            if _bootstrap is None:
+                _bootstrap = AtlasCoderBootstrap()
+            bootstrap = _bootstrap
+    return bootstrap
 
 def get_self_improvement() -> SelfImprovementEngine:
     """Get global self-improvement instance"""
     global _self_improvement
-    if _self_improvement is None:
-        _self_improvement = SelfImprovementEngine()
-    return _self_improvement
\ No newline at end of file
+    engine = _self_improvement
+    if engine is None:
+        # Double-checked so concurrent first calls build a single instance
+        with _self_improvement_lock:
+            if _self_improvement is None:
+                _self_improvement = SelfImprovementEngine()
+            engine = _self_improvement
+    return engine
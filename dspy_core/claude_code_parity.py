@@ -4,9 +4,15 @@ Match Claude Code capabilities using DSPy + OpenRouter flexibility
 """
 
 import os
+import re
 import json
-import subprocess
-from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import time
+import threading
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from typing import Dict, Any, List, Optional, Set, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -14,6 +20,66 @@ import dspy
 from .signatures import *
 from .workflows import get_orchestrator
 from .optimization import get_cost_tracker
+from .git_state import read_git_state
+
+_PY_FILE_RE = re.compile(r'[\w/.]+\.py')
+
+# Set inside batch fan-outs so concurrent workers don't contend on stdout
+_quiet_progress: ContextVar[bool] = ContextVar('_quiet_progress', default=False)
+
+# Generated/vendored directories that are never worth walking
+_PRUNE_DIRS = frozenset({'node_modules', '__pycache__', 'venv', 'dist', 'build'})
+_LARGE_FILE_BYTES = 10 * 1024 * 1024  # 10MB
+
+# File suffix -> _scan_project_files category
+_SUFFIX_CATEGORIES = {
+    **dict.fromkeys(['.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs'], 'source_files'),
+    **dict.fromkeys(['.json', '.yaml', '.yml', '.toml', '.ini', '.cfg'], 'config_files'),
+    **dict.fromkeys(['.md', '.txt', '.rst'], 'documentation'),
+}
+
+# Task keywords -> workflow handler, checked in order; first match wins
+_WORKFLOW_ROUTES = (
+    (('bug', 'fix'), '_execute_bug_fix_workflow'),
+    (('feature', 'implement'), '_execute_feature_workflow'),
+    (('optimize', 'performance'), '_execute_optimization_workflow'),
+    (('refactor',), '_execute_refactoring_workflow'),
+    (('test',), '_execute_testing_workflow'),
+)
+
+# Project constraints that don't depend on runtime state
+_STATIC_CONSTRAINTS = '\n'.join([
+    "Maintain existing architecture patterns",
+    "Follow project coding conventions",
+    "Ensure backward compatibility",
+    "Optimize for performance and maintainability"
+])
+
+def _in_event_loop() -> bool:
+    """True when called from a thread that is running an asyncio loop (asyncio.run would fail)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def _ttl_cache(seconds: float):
+    """Cache a no-argument helper per instance and project root for `seconds`"""
+    def decorator(method):
+        name = method.__name__
+        
+        @wraps(method)
+        def wrapper(self):
+            key = (name, self.project_root)
+            hit = self._context_cache.get(key)
+            now = time.monotonic()
+            if hit is not None and now - hit[0] < seconds:
+                return hit[1]
+            value = method(self)
+            self._context_cache[key] = (now, value)
+            return value
+        return wrapper
+    return decorator
 
 # Claude Code equivalent signatures
 class ProjectManagement(dspy.Signature):
@@ -69,27 +135,57 @@ class ClaudeCodeEquivalent(dspy.Module):
     def __init__(self):
         super().__init__()
         # Core capabilities
-        self.file_analyzer = dspy.ChainOfThought(AnalyzeCode)
-        self.code_generator = dspy.ProgramOfThought(GenerateCode)
-        self.project_manager = dspy.ChainOfThought(ProjectManagement)
-        self.git_manager = dspy.ChainOfThought(GitOperations)
-        self.file_manager = dspy.ChainOfThought(FileOperations)
+        self.file_analyzer = self._shared_module(dspy.ChainOfThought, AnalyzeCode)
+        self.code_generator = self._shared_module(dspy.ProgramOfThought, GenerateCode)
+        self.project_manager = self._shared_module(dspy.ChainOfThought, ProjectManagement)
+        self.git_manager = self._shared_module(dspy.ChainOfThought, GitOperations)
+        self.file_manager = self._shared_module(dspy.ChainOfThought, FileOperations)
         
         # Advanced capabilities
-        self.architect = dspy.ChainOfThought(ArchitectureDesign)
-        self.performance_optimizer = dspy.ProgramOfThought(PerformanceOptimization)
-        self.security_analyzer = dspy.ChainOfThought(SecurityAudit)
+        self.architect = self._shared_module(dspy.ChainOfThought, ArchitectureDesign)
+        self.performance_optimizer = self._shared_module(dspy.ProgramOfThought, PerformanceOptimization)
+        self.security_analyzer = self._shared_module(dspy.ChainOfThought, SecurityAudit)
         
         # Project state tracking
         self.project_root = Path.cwd()
         self.project_state = {}
-        
+        self.verbose = os.environ.get('CLAUDE_CODER_VERBOSE', '1') != '0'
+        # Serialized prompt inputs, refreshed whenever project_state is rebuilt
+        self._project_state_json: Optional[str] = None
+        self._arch_json = '{}'
+        self._walk_cache: Dict[Path, List[Tuple[str, int, str]]] = {}
+        self._context_cache: Dict[Tuple[str, Path], Tuple[float, Any]] = {}
+        
+    def _progress(self, message: str):
+        """Print a progress line unless disabled or running inside a batch"""
+        if self.verbose and not _quiet_progress.get():
+            print(message)
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _shared_module(cls, module_type, signature):
+        """Build each DSPy predictor once per process and share it across instances"""
+        return module_type(signature)
+    
+    def reset_project(self, path: Optional[str] = None):
+        """Point at a project root (default: cwd) and drop state derived from the previous one"""
+        self.project_root = Path(path) if path else Path.cwd()
+        self.project_state = {}
+        self._project_state_json = None
+        self._arch_json = '{}'
+        self._walk_cache.clear()
+        self._context_cache.clear()
+    
     def analyze_project_structure(self, path: Optional[str] = None) -> Dict[str, Any]:
         """Analyze complete project structure like Claude Code"""
         if path:
             self.project_root = Path(path)
         
-        print("🔍 Analyzing project structure...")
+        self._progress("🔍 Analyzing project structure...")
+        
+        # Fresh analysis: walk the tree once and share it across the analyzers
+        self._walk_cache.clear()
+        self._context_cache.clear()
         
         structure = {
             'files': self._scan_project_files(),
@@ -101,11 +197,15 @@ class ClaudeCodeEquivalent(dspy.Module):
         }
         
         self.project_state = structure
+        # sort_keys keeps the prompt prefix byte-identical across calls so
+        # providers with automatic prefix caching can reuse it
+        self._project_state_json = json.dumps(structure, default=str, sort_keys=True)
+        self._arch_json = json.dumps(structure['architecture'], sort_keys=True)
         return structure
     
     def plan_development_workflow(self, user_request: str) -> Dict[str, Any]:
         """Plan complete development workflow like Claude Code"""
-        print(f"📋 Planning workflow for: {user_request}")
+        self._progress(f"📋 Planning workflow for: {user_request}")
         
         # Analyze current state
         if not self.project_state:
@@ -113,7 +213,7 @@ class ClaudeCodeEquivalent(dspy.Module):
         
         # Generate project management plan
         planning = self.project_manager(
-            project_state=json.dumps(self.project_state, default=str),
+            project_state=self._project_state_json or json.dumps(self.project_state, default=str, sort_keys=True),
             user_intent=user_request,
             recent_changes=self._get_recent_changes()
         )
@@ -127,25 +227,41 @@ class ClaudeCodeEquivalent(dspy.Module):
     
     def execute_development_task(self, task_description: str) -> Dict[str, Any]:
         """Execute development task with full workflow like Claude Code"""
-        print(f"⚡ Executing task: {task_description}")
+        self._progress(f"⚡ Executing task: {task_description}")
         
         # Determine task type and execute appropriate workflow
-        if 'bug' in task_description.lower() or 'fix' in task_description.lower():
-            return self._execute_bug_fix_workflow(task_description)
-        elif 'feature' in task_description.lower() or 'implement' in task_description.lower():
-            return self._execute_feature_workflow(task_description)
-        elif 'optimize' in task_description.lower() or 'performance' in task_description.lower():
-            return self._execute_optimization_workflow(task_description)
-        elif 'refactor' in task_description.lower():
-            return self._execute_refactoring_workflow(task_description)
-        elif 'test' in task_description.lower():
-            return self._execute_testing_workflow(task_description)
-        else:
-            return self._execute_general_workflow(task_description)
+        return getattr(self, self._route_task(task_description))(task_description)
+    
+    async def execute_development_task_async(self, task_description: str) -> Dict[str, Any]:
+        """Execute a development task on a worker thread so several can overlap"""
+        return await asyncio.to_thread(self.execute_development_task, task_description)
+    
+    async def batch_execute(self, tasks: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Execute several development tasks concurrently, bounded by a semaphore"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def bounded(task: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute_development_task_async(task)
+        
+        token = _quiet_progress.set(True)
+        try:
+            return await asyncio.gather(*(bounded(t) for t in tasks))
+        finally:
+            _quiet_progress.reset(token)
+    
+    @staticmethod
+    def _route_task(task_description: str) -> str:
+        """Pick the workflow handler name for a task description"""
+        lowered = task_description.lower()
+        for keywords, handler in _WORKFLOW_ROUTES:
+            if any(keyword in lowered for keyword in keywords):
+                return handler
+        return '_execute_general_workflow'
     
     def manage_git_workflow(self, changes_description: str) -> Dict[str, Any]:
         """Manage git operations like Claude Code"""
-        print("📝 Managing git workflow...")
+        self._progress("📝 Managing git workflow...")
         
         git_management = self.git_manager(
             changes_summary=changes_description,
@@ -161,12 +277,12 @@ class ClaudeCodeEquivalent(dspy.Module):
     
     def design_architecture(self, requirements: str) -> Dict[str, Any]:
         """Design system architecture like Claude Code"""
-        print("🏗️ Designing system architecture...")
+        self._progress("🏗️ Designing system architecture...")
         
         architecture = self.architect(
             requirements=requirements,
             constraints=self._get_constraints(),
-            existing_system=json.dumps(self.project_state.get('architecture', {}))
+            existing_system=self._arch_json
         )
         
         return {
@@ -178,7 +294,7 @@ class ClaudeCodeEquivalent(dspy.Module):
     
     def optimize_performance(self, target_code: str, goals: str) -> Dict[str, Any]:
         """Optimize performance like Claude Code"""
-        print("🚀 Optimizing performance...")
+        self._progress("🚀 Optimizing performance...")
         
         optimization = self.performance_optimizer(
             code=target_code,
@@ -195,21 +311,40 @@ class ClaudeCodeEquivalent(dspy.Module):
     
     def comprehensive_code_review(self, file_path: str) -> Dict[str, Any]:
         """Comprehensive code review like Claude Code"""
-        print(f"📊 Reviewing code: {file_path}")
+        if not _in_event_loop():
+            return asyncio.run(self.comprehensive_code_review_async(file_path))
+        
+        # Inside a running event loop asyncio.run() is unavailable: review sequentially
+        self._progress(f"📊 Reviewing code: {file_path}")
         
         try:
-            with open(file_path, 'r') as f:
-                code = f.read()
+            code = Path(file_path).read_text()
         except Exception as e:
             return {'error': f'Could not read file: {e}'}
         
-        # Multi-dimensional analysis
         analysis = self.file_analyzer(code=code)
-        security = self.security_analyzer(
-            code=code,
-            context=self._get_project_context()
-        )
+        security = self.security_analyzer(code=code, context=self._get_project_context())
+        return self._review_result(analysis, security)
+    
+    async def comprehensive_code_review_async(self, file_path: str) -> Dict[str, Any]:
+        """Review code with the quality and security analyzers running concurrently"""
+        self._progress(f"📊 Reviewing code: {file_path}")
+        
+        try:
+            code = await asyncio.to_thread(Path(file_path).read_text)
+        except Exception as e:
+            return {'error': f'Could not read file: {e}'}
         
+        # Multi-dimensional analysis - the two LLM calls are independent
+        context = await asyncio.to_thread(self._get_project_context)
+        analysis, security = await asyncio.gather(
+            asyncio.to_thread(self.file_analyzer, code=code),
+            asyncio.to_thread(self.security_analyzer, code=code, context=context)
+        )
+        return self._review_result(analysis, security)
+    
+    def _review_result(self, analysis, security) -> Dict[str, Any]:
+        """Assemble the review output from the two analyzer results"""
         return {
             'code_quality': {
                 'analysis': analysis.analysis,
@@ -224,7 +359,57 @@ class ClaudeCodeEquivalent(dspy.Module):
             'recommendations': self._generate_comprehensive_recommendations(analysis, security)
         }
     
+    async def batch_review(self, file_paths: List[str],
+                           max_concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Review many files concurrently, bounded by a semaphore"""
+        if max_concurrency is None:
+            max_concurrency = int(os.environ.get('CLAUDE_CODER_BATCH_SIZE', '8'))
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def bounded(file_path: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.comprehensive_code_review_async(file_path)
+        
+        # gather() copies the current context into each task
+        token = _quiet_progress.set(True)
+        try:
+            results = await asyncio.gather(*(bounded(p) for p in file_paths))
+        finally:
+            _quiet_progress.reset(token)
+        return dict(zip(file_paths, results))
+    
     # Private helper methods
+    def _walk_project(self) -> List[Tuple[str, int, str]]:
+        """Walk the project tree once, returning (relative path, size, suffix) per file"""
+        cached = self._walk_cache.get(self.project_root)
+        if cached is not None:
+            return cached
+        
+        files = []
+        pending = deque([''])
+        while pending:
+            rel_dir = pending.popleft()
+            try:
+                with os.scandir(os.path.join(self.project_root, rel_dir)) as it:
+                    for entry in it:
+                        # Skipping dotted entries here prunes .git, .venv, ... wholesale
+                        if entry.name.startswith('.'):
+                            continue
+                        rel_path = os.path.join(rel_dir, entry.name)
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in _PRUNE_DIRS:
+                                pending.append(rel_path)
+                        elif entry.is_file():
+                            files.append((rel_path, entry.stat().st_size, os.path.splitext(entry.name)[1]))
+            except OSError as e:
+                if not rel_dir:
+                    print(f"⚠️ File scan error: {e}")
+        
+        # scandir order is filesystem-dependent; sort for stable prompts
+        files.sort()
+        self._walk_cache[self.project_root] = files
+        return files
+    
     def _scan_project_files(self) -> Dict[str, Any]:
         """Scan and categorize project files"""
         files = {
@@ -235,59 +420,51 @@ class ClaudeCodeEquivalent(dspy.Module):
             'assets': []
         }
         
-        try:
-            for file_path in self.project_root.rglob('*'):
-                if file_path.is_file() and not any(part.startswith('.') for part in file_path.parts):
-                    rel_path = file_path.relative_to(self.project_root)
-                    
-                    if file_path.suffix in ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs']:
-                        files['source_files'].append(str(rel_path))
-                    elif file_path.suffix in ['.json', '.yaml', '.yml', '.toml', '.ini', '.cfg']:
-                        files['config_files'].append(str(rel_path))
-                    elif file_path.suffix in ['.md', '.txt', '.rst']:
-                        files['documentation'].append(str(rel_path))
-                    elif 'test' in str(file_path).lower():
-                        files['tests'].append(str(rel_path))
-                    else:
-                        files['assets'].append(str(rel_path))
-        except Exception as e:
-            print(f"⚠️ File scan error: {e}")
+        for rel_path, _, suffix in self._walk_project():
+            category = _SUFFIX_CATEGORIES.get(suffix)
+            if category is None:
+                category = 'tests' if 'test' in rel_path.lower() else 'assets'
+            files[category].append(rel_path)
         
         return files
     
+    @_ttl_cache(seconds=30)
+    def _git_state(self) -> Tuple[Optional[str], Optional[str]]:
+        """Read git status and recent log together, in-process via pygit2 when available"""
+        return read_git_state(self.project_root)
+    
     def _get_git_status(self) -> str:
         """Get git status"""
+        status = self._git_state()[0]
+        return status if status is not None else "Not a git repository"
+    
+    def _top_level_names(self) -> Set[str]:
+        """Names in the project root, from a single directory listing"""
         try:
-            result = subprocess.run(
-                ['git', 'status', '--porcelain'],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.stdout if result.returncode == 0 else "Not a git repository"
-        except:
-            return "Git status unavailable"
+            with os.scandir(self.project_root) as it:
+                return {entry.name for entry in it}
+        except OSError:
+            return set()
     
     def _analyze_dependencies(self) -> Dict[str, Any]:
         """Analyze project dependencies"""
         deps = {}
+        top = self._top_level_names()
         
         # Python dependencies
         requirements_files = ['requirements.txt', 'pyproject.toml', 'setup.py']
         for req_file in requirements_files:
-            req_path = self.project_root / req_file
-            if req_path.exists():
+            if req_file in top:
                 deps['python'] = req_file
                 break
         
         # Node.js dependencies
-        if (self.project_root / 'package.json').exists():
+        if 'package.json' in top:
             deps['nodejs'] = 'package.json'
         
         # Other common dependency files
         for dep_file in ['Cargo.toml', 'go.mod', 'pom.xml', 'build.gradle']:
-            if (self.project_root / dep_file).exists():
+            if dep_file in top:
                 deps[dep_file.split('.')[0]] = dep_file
         
         return deps
@@ -333,19 +510,17 @@ class ClaudeCodeEquivalent(dspy.Module):
         issues = []
         
         # Check for common issues
-        if not (self.project_root / 'README.md').exists():
+        top = self._top_level_names()
+        if 'README.md' not in top:
             issues.append("Missing README.md file")
         
-        if not (self.project_root / '.gitignore').exists():
+        if '.gitignore' not in top:
             issues.append("Missing .gitignore file")
         
         # Check for large files
-        try:
-            for file_path in self.project_root.rglob('*'):
-                if file_path.is_file() and file_path.stat().st_size > 10 * 1024 * 1024:  # 10MB
-                    issues.append(f"Large file detected: {file_path.name}")
-        except:
-            pass
+        for rel_path, size, _ in self._walk_project():
+            if size > _LARGE_FILE_BYTES:
+                issues.append(f"Large file detected: {os.path.basename(rel_path)}")
         
         return issues
     
@@ -368,18 +543,10 @@ class ClaudeCodeEquivalent(dspy.Module):
     
     def _get_recent_changes(self) -> str:
         """Get recent changes"""
-        try:
-            result = subprocess.run(
-                ['git', 'log', '--oneline', '-5'],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.stdout if result.returncode == 0 else "No recent changes"
-        except:
-            return "Recent changes unavailable"
+        log = self._git_state()[1]
+        return log if log is not None else "No recent changes"
     
+    @_ttl_cache(seconds=30)
     def _get_project_context(self) -> str:
         """Get project context"""
         context = []
@@ -388,8 +555,8 @@ class ClaudeCodeEquivalent(dspy.Module):
         readme_path = self.project_root / 'README.md'
         if readme_path.exists():
             try:
-                with open(readme_path, 'r') as f:
-                    context.append(f.read()[:1000])  # First 1000 chars
+                with open(readme_path, 'r', encoding='utf-8', errors='replace') as f:
+                    context.append(f.read(1000))  # First 1000 chars
             except:
                 pass
         
@@ -397,8 +564,8 @@ class ClaudeCodeEquivalent(dspy.Module):
         claude_path = self.project_root / 'CLAUDE.md'
         if claude_path.exists():
             try:
-                with open(claude_path, 'r') as f:
-                    context.append(f.read()[:500])
+                with open(claude_path, 'r', encoding='utf-8', errors='replace') as f:
+                    context.append(f.read(500))
             except:
                 pass
         
@@ -406,19 +573,10 @@ class ClaudeCodeEquivalent(dspy.Module):
     
     def _get_constraints(self) -> str:
         """Get project constraints"""
-        constraints = [
-            "Maintain existing architecture patterns",
-            "Follow project coding conventions", 
-            "Ensure backward compatibility",
-            "Optimize for performance and maintainability"
-        ]
-        
-        # Add budget constraints
+        # Budget changes with every call that spends, so it is never cached
         cost_tracker = get_cost_tracker()
         remaining = cost_tracker.get_remaining_budget()
-        constraints.append(f"Budget constraint: ${remaining:.2f} remaining")
-        
-        return '\n'.join(constraints)
+        return f"{_STATIC_CONSTRAINTS}\nBudget constraint: ${remaining:.2f} remaining"
     
     def _execute_bug_fix_workflow(self, task: str) -> Dict[str, Any]:
         """Execute bug fix workflow"""
@@ -509,8 +667,7 @@ class ClaudeCodeEquivalent(dspy.Module):
         context = {'code': '', 'context': ''}
         
         # Look for file references in task
-        import re
-        file_refs = re.findall(r'[\w\/\.]+\.py', task)
+        file_refs = _PY_FILE_RE.findall(task)
         
         if file_refs:
             for file_ref in file_refs:
@@ -553,42 +710,66 @@ class ClaudeCodeEquivalent(dspy.Module):
         return recommendations[:5]  # Top 5 recommendations
 
 # Convenience functions for Claude Code parity
+# Each call gets its own instance rooted at the current directory (or the given path),
+# so concurrent callers never see each other's project state. Construction is cheap:
+# the DSPy predictors are shared per class, and the global instance is left untouched
+def _project_session(path: Optional[str] = None) -> 'ClaudeCodeEquivalent':
+    """Fresh instance for the given project root"""
+    instance = ClaudeCodeEquivalent()
+    if path:
+        instance.reset_project(path)
+    return instance
+
 def analyze_project(path: Optional[str] = None) -> Dict[str, Any]:
     """Analyze project like Claude Code"""
-    claude_equivalent = ClaudeCodeEquivalent()
-    return claude_equivalent.analyze_project_structure(path)
+    return _project_session(path).analyze_project_structure()
 
 def plan_workflow(user_request: str) -> Dict[str, Any]:
     """Plan development workflow like Claude Code"""
-    claude_equivalent = ClaudeCodeEquivalent()
-    return claude_equivalent.plan_development_workflow(user_request)
+    return _project_session().plan_development_workflow(user_request)
 
 def execute_task(task_description: str) -> Dict[str, Any]:
     """Execute development task like Claude Code"""
-    claude_equivalent = ClaudeCodeEquivalent()
-    return claude_equivalent.execute_development_task(task_description)
+    return _project_session().execute_development_task(task_description)
+
+def execute_tasks(task_descriptions: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+    """Execute several development tasks concurrently"""
+    session = _project_session()
+    if _in_event_loop():
+        return [session.execute_development_task(task) for task in task_descriptions]
+    return asyncio.run(session.batch_execute(task_descriptions, concurrency))
 
 def manage_git(changes_description: str) -> Dict[str, Any]:
     """Manage git operations like Claude Code"""
-    claude_equivalent = ClaudeCodeEquivalent()
-    return claude_equivalent.manage_git_workflow(changes_description)
+    return _project_session().manage_git_workflow(changes_description)
 
 def design_system(requirements: str) -> Dict[str, Any]:
     """Design system architecture like Claude Code"""
-    claude_equivalent = ClaudeCodeEquivalent()
-    return claude_equivalent.design_architecture(requirements)
+    return _project_session().design_architecture(requirements)
 
 def review_code(file_path: str) -> Dict[str, Any]:
     """Comprehensive code review like Claude Code"""
-    claude_equivalent = ClaudeCodeEquivalent()
-    return claude_equivalent.comprehensive_code_review(file_path)
+    return _project_session().comprehensive_code_review(file_path)
+
+def review_files(file_paths: List[str], max_concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Review several files concurrently"""
+    session = _project_session()
+    if _in_event_loop():
+        return {path: session.comprehensive_code_review(path) for path in file_paths}
+    return asyncio.run(session.batch_review(file_paths, max_concurrency))
 
 # Global instance
 _claude_equivalent = None
+_claude_equivalent_lock = threading.Lock()
 
 def get_claude_equivalent() -> ClaudeCodeEquivalent:
     """Get global Claude Code equivalent instance"""
     global _claude_equivalent
-    if _claude_equivalent is None:
-        _claude_equivalent = ClaudeCodeEquivalent()
-    return _claude_equivalent
\ No newline at end of file
+    instance = _claude_equivalent
+    if instance is None:
+        # Double-checked so concurrent first calls build a single instance
+        with _claude_equivalent_lock:
+            if _claude_equivalent is None:
+                _claude_equivalent = ClaudeCodeEquivalent()
+            instance = _claude_equivalent
+    return instance
\ No newline at end of file
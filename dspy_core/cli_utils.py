@@ -0,0 +1,73 @@
+"""
+Shared helpers for the Atlas Coder command line interfaces
+Input/output handling and workflow mapping used by atlas_dspy and atlas_dspy_v6
+"""
+
+import os
+import sys
+from types import MappingProxyType
+
+# Map CLI workflows to internal workflow types
+WORKFLOW_MAP = MappingProxyType({
+    "fix-bug": "bug_fix",
+    "generate": "generate",
+    "analyze": "analyze",
+    "project": "project",
+    "refactor": "refactor"
+})
+
+# Build workflow parameters from (input, context) for each internal workflow type
+PARAM_BUILDERS = MappingProxyType({
+    "bug_fix": lambda i, c: {"code": i, "error": c or "General error analysis"},
+    "generate": lambda i, c: {"requirements": i, "constraints": c},
+    "analyze": lambda i, c: {"code": i, "context": c},
+    "project": lambda i, c: {"requirements": i, "constraints": c},
+    "refactor": lambda i, c: {"code": i, "goals": c or "improve readability and maintainability"},
+})
+
+# Decorative icons are only emitted when stdout is a terminal
+_TTY = sys.stdout.isatty()
+
+def icon(emoji: str, fallback: str = '') -> str:
+    """Return emoji on a TTY, fallback otherwise"""
+    return emoji if _TTY else fallback
+
+def read_input(input_arg: str) -> str:
+    """Read input from file or use as direct input"""
+    if not input_arg:
+        return ""
+    
+    # Try it as a file path first; open() doubles as the existence check
+    try:
+        with open(input_arg, 'rb', buffering=128 * 1024) as f:
+            data = f.read()
+    except PermissionError as e:
+        print(f"{icon('⚠️ ')}Could not read file {input_arg}: {e}")
+        return input_arg
+    except (OSError, ValueError):
+        # Not a readable file (missing, directory, name too long) - use as direct input
+        return input_arg
+    
+    # Binary reads skip universal newlines; normalize as text-mode open() would
+    return data.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+# Output writes use a large buffer; payloads past the threshold skip TextIOWrapper
+OUTPUT_BUFFER_SIZE = 256 * 1024
+LARGE_OUTPUT_THRESHOLD = 1024 * 1024
+
+def write_output_file(output_file: str, content: str):
+    """Write text content to output_file"""
+    if len(content) < LARGE_OUTPUT_THRESHOLD:
+        with open(output_file, 'w', buffering=OUTPUT_BUFFER_SIZE, encoding='utf-8') as f:
+            f.write(content)
+        return
+    
+    data = memoryview(content.encode('utf-8'))
+    fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for offset in range(0, len(data), LARGE_OUTPUT_THRESHOLD):
+            chunk = data[offset:offset + LARGE_OUTPUT_THRESHOLD]
+            while chunk:
+                chunk = chunk[os.write(fd, chunk):]
+    finally:
+        os.close(fd)
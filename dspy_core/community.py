@@ -4,45 +4,92 @@ Learn from community usage while maintaining privacy
 """
 
 import os
+import re
+import sys
 import json
+import atexit
 import hashlib
 import time
-from typing import Dict, Any, List, Optional, Set
+import threading
+from collections import Counter, defaultdict, deque
+from functools import cached_property, lru_cache
+from operator import attrgetter
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 
-import dspy
+from .cache import get_signature_cache, active_model_name
+from .paths import atlas_home, write_private_file
 
-# Community learning signatures
-class PatternAnalysis(dspy.Signature):
-    """Analyze successful interactions for reusable patterns"""
-    successful_interactions = dspy.InputField(desc="Anonymized successful interactions and outcomes")
-    context_type = dspy.InputField(desc="Type of context (bug_fix, code_generation, analysis, etc.)")
-    usage_frequency = dspy.InputField(desc="How frequently this pattern appears")
-    reusable_patterns = dspy.OutputField(desc="Identified reusable patterns and best practices")
-    optimization_opportunities = dspy.OutputField(desc="Opportunities for optimization and improvement")
-    generalization_potential = dspy.OutputField(desc="How well this pattern generalizes to other contexts")
+# dspy is imported on first LLM use: pattern recording and stats never need it,
+# and importing it pulls in the whole LiteLLM stack
 
-class SignatureOptimization(dspy.Signature):
-    """Optimize DSPy signatures based on usage patterns"""
-    usage_patterns = dspy.InputField(desc="Patterns of successful signature usage")
-    performance_data = dspy.InputField(desc="Performance metrics for different signature configurations")
-    context_variations = dspy.InputField(desc="Different contexts where signature is used")
-    improved_signatures = dspy.OutputField(desc="Optimized signature definitions")
-    better_compositions = dspy.OutputField(desc="Improved module compositions")
-    usage_guidelines = dspy.OutputField(desc="Guidelines for optimal signature usage")
+# Compact separators: pattern files are machine-read, not hand-edited
+_encode_pattern = json.JSONEncoder(separators=(',', ':')).encode
+# Reusable encoders: json.dumps(..., sort_keys=True) builds a new encoder per call.
+# Prompt payloads are compact (fewer tokens); anonymization keeps the default
+# separators because the serialized length is part of the anonymized form.
+_encode_prompt = json.JSONEncoder(sort_keys=True, separators=(',', ':')).encode
+_encode_content = json.JSONEncoder(sort_keys=True).encode
 
-class CommunityInsights(dspy.Signature):
-    """Generate insights from community usage data"""
-    aggregated_patterns = dspy.InputField(desc="Aggregated patterns from community usage")
-    success_metrics = dspy.InputField(desc="Success metrics and performance data")
-    common_challenges = dspy.InputField(desc="Common challenges and failure patterns")
-    community_insights = dspy.OutputField(desc="Insights about effective DSPy usage patterns")
-    best_practices = dspy.OutputField(desc="Community-derived best practices")
-    improvement_recommendations = dspy.OutputField(desc="Recommendations for framework improvements")
+# Personal-information scrubbing, compiled once. Applied in order: later patterns
+# see earlier replacements (a long string is measured after its paths are masked).
+_ANON_SUBSTITUTIONS = (
+    (re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'), '[EMAIL]'),
+    (re.compile(r'https?://[^\s]+'), '[URL]'),
+    (re.compile(r'/[^\s]*'), '[PATH]'),
+    (re.compile(r'"[^"]{50,}"'), '"[LONG_STRING]"'),
+)
 
-@dataclass
+# SignatureCache namespaces for the LLM analyses, keyed by their exact prompt inputs
+_OPTIMIZATION_SIGNATURE = "community_signature_optimization"
+_INSIGHTS_SIGNATURE = "community_insights"
+
+def _fast_hash(data: bytes) -> str:
+    """16-hex-char non-cryptographic identifier for pattern dedup"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+# Patterns migrated from local_patterns.json were identified with SHA-256 (salted
+# content hash, then pattern id). Those hashes can't be converted, so migrated patterns
+# keep their old id under this prefix and are re-keyed the first time they recur
+_LEGACY_PREFIX = "legacy_"
+
+def _legacy_anonymized(content_str: str, salt: str) -> str:
+    """Anonymized form of scrubbed content under the pre-blake2b scheme"""
+    content_hash = hashlib.sha256((content_str + salt).encode()).hexdigest()[:32]
+    return f"anonymized_{len(content_str)}_{content_hash}"
+
+def _scrub_content(content: Dict[str, Any]) -> str:
+    """Serialize content with emails, URLs, file paths and long strings masked"""
+    content_str = _encode_content(content)
+    for pattern, replacement in _ANON_SUBSTITUTIONS:
+        content_str = pattern.sub(replacement, content_str)
+    return content_str
+
+# Storage failures tend to repeat on every flush; show each distinct one once a minute
+_WARNING_INTERVAL = 60
+_warned: Set[str] = set()
+_warned_window = None
+
+def _warn_throttled(message: str):
+    """Print a warning, suppressing repeats of the same text within the interval"""
+    global _warned_window
+    window = int(time.monotonic() // _WARNING_INTERVAL)
+    if window != _warned_window:
+        _warned.clear()
+        _warned_window = window
+    if message not in _warned:
+        _warned.add(message)
+        print(f"⚠️ {message}")
+
+def _to_epoch_ns(value: Any) -> int:
+    """Normalize a stored timestamp (epoch ns or ISO string) to epoch ns"""
+    if isinstance(value, int):
+        return value
+    return round(datetime.fromisoformat(value).timestamp() * 1_000_000) * 1000
+
+@dataclass(slots=True)
 class InteractionPattern:
     """Represents a successful interaction pattern"""
     pattern_id: str
@@ -52,22 +99,74 @@ class InteractionPattern:
     output_pattern: str  # Anonymized pattern
     success_metrics: Dict[str, float]
     usage_count: int
-    created_at: datetime
-    last_used: datetime
+    created_at: int  # Epoch nanoseconds
+    last_used: int  # Epoch nanoseconds
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
-        data = asdict(self)
-        data['created_at'] = self.created_at.isoformat()
-        data['last_used'] = self.last_used.isoformat()
-        return data
+        return asdict(self)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'InteractionPattern':
-        """Create from dictionary"""
-        data['created_at'] = datetime.fromisoformat(data['created_at'])
-        data['last_used'] = datetime.fromisoformat(data['last_used'])
+        """Create from dictionary (accepts epoch ns or legacy ISO timestamps)"""
+        data['signature_type'] = sys.intern(data['signature_type'])
+        data['context_type'] = sys.intern(data['context_type'])
+        data['created_at'] = _to_epoch_ns(data['created_at'])
+        data['last_used'] = _to_epoch_ns(data['last_used'])
         return cls(**data)
+    
+    @property
+    def created_datetime(self) -> datetime:
+        """Creation time as a datetime"""
+        return datetime.fromtimestamp(self.created_at / 1e9)
+    
+    @property
+    def last_used_datetime(self) -> datetime:
+        """Last use time as a datetime"""
+        return datetime.fromtimestamp(self.last_used / 1e9)
+
+@dataclass(slots=True)
+class PatternStats:
+    """Aggregates collected in a single pass over a set of patterns"""
+    total: int
+    total_usage: int
+    by_signature: Dict[str, Dict[str, int]]
+    by_context: Dict[str, Dict[str, int]]
+    low_quality_count: int
+    single_use_count: int
+
+_signature_type = attrgetter('signature_type')
+_context_type = attrgetter('context_type')
+
+def _scan_patterns(patterns: Iterable[InteractionPattern]) -> PatternStats:
+    """Compute every statistics/insights aggregate in one traversal"""
+    patterns = list(patterns)
+    # Group sizes are counted in C; the loop below only accumulates sums
+    signature_counts = Counter(map(_signature_type, patterns))
+    context_counts = Counter(map(_context_type, patterns))
+    
+    total_usage = low_quality_count = single_use_count = 0
+    signature_usage: Dict[str, int] = {}
+    context_usage: Dict[str, int] = {}
+    
+    for pattern in patterns:
+        usage = pattern.usage_count
+        total_usage += usage
+        if usage == 1:
+            single_use_count += 1
+        
+        sig_type = pattern.signature_type
+        ctx_type = pattern.context_type
+        signature_usage[sig_type] = signature_usage.get(sig_type, 0) + usage
+        context_usage[ctx_type] = context_usage.get(ctx_type, 0) + usage
+        
+        if pattern.success_metrics.get('quality_score', 1.0) < 0.7:
+            low_quality_count += 1
+    
+    by_signature = {k: {'count': n, 'total_usage': signature_usage[k]} for k, n in signature_counts.items()}
+    by_context = {k: {'count': n, 'total_usage': context_usage[k]} for k, n in context_counts.items()}
+    return PatternStats(len(patterns), total_usage, by_signature, by_context,
+                        low_quality_count, single_use_count)
 
 class CommunityPatternLearning:
     """Learn from community usage while maintaining privacy"""
@@ -76,15 +175,16 @@ class CommunityPatternLearning:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         
-        # Pattern analysis modules
-        self.pattern_analyzer = dspy.ChainOfThought(PatternAnalysis)
-        self.signature_optimizer = dspy.ChainOfThought(SignatureOptimization)
-        self.insights_generator = dspy.ChainOfThought(CommunityInsights)
-        
-        # Storage
-        self.local_patterns_file = self.cache_dir / "local_patterns.json"
+        # Storage: local patterns are an append-only JSONL log (later lines win),
+        # compacted every compact_every appends and at exit
+        self.local_patterns_file = self.cache_dir / "local_patterns.jsonl"
         self.community_patterns_file = self.cache_dir / "community_patterns.json"
         self.optimization_cache_file = self.cache_dir / "optimizations.json"
+        self.compact_every = 100
+        self._appends_since_compact = 0
+        # Migrated patterns not yet re-keyed, and whether a flush re-keyed any
+        self._legacy_count = 0
+        self._rekeyed = False
         
         # Privacy settings
         self.enable_sharing = os.getenv('ATLAS_SHARE_PATTERNS', 'false').lower() == 'true'
@@ -94,8 +194,76 @@ class CommunityPatternLearning:
         self.local_patterns: Dict[str, InteractionPattern] = {}
         self.community_patterns: Dict[str, InteractionPattern] = {}
         self.optimization_cache: Dict[str, Any] = {}
+        # Local patterns grouped by signature type, maintained on insert
+        self._by_signature: Dict[str, List[InteractionPattern]] = defaultdict(list)
+        
+        # Aggregates per scope, reused until the patterns change
+        self._patterns_version = 0
+        self._stats_cache: Dict[str, Tuple[int, PatternStats]] = {}
+        # Per-metric sum/count over all patterns, kept current on every change
+        self._metric_sums: Dict[str, float] = {}
+        self._metric_counts: Dict[str, int] = {}
+        
+        # Recorded interactions wait here until a reader needs them (or the buffer fills)
+        self.pending_limit = 1000
+        self._pending: deque = deque()
+        self._flush_lock = threading.Lock()
+        # Local analysis (an LLM call) runs from the write path once per analyze_every flushes
+        self.analyze_every = 100
+        self._flushes_since_analysis = 0
         
         self._load_patterns()
+        atexit.register(self._compact_local_patterns)
+        # atexit runs LIFO: flush buffered interactions before the final compaction
+        atexit.register(self._flush_pending, analyze=False)
+    
+    # Pattern analysis modules, built on first use so dspy is only imported when needed.
+    # Inputs are declared short/stable first and bulky pattern data last: DSPy renders
+    # fields in declaration order, so repeat calls share the longest possible prompt prefix
+    @cached_property
+    def pattern_analyzer(self):
+        import dspy
+        
+        class PatternAnalysis(dspy.Signature):
+            """Analyze successful interactions for reusable patterns"""
+            context_type = dspy.InputField(desc="Type of context (bug_fix, code_generation, analysis, etc.)")
+            usage_frequency = dspy.InputField(desc="How frequently this pattern appears")
+            successful_interactions = dspy.InputField(desc="Anonymized successful interactions and outcomes")
+            reusable_patterns = dspy.OutputField(desc="Identified reusable patterns and best practices")
+            optimization_opportunities = dspy.OutputField(desc="Opportunities for optimization and improvement")
+            generalization_potential = dspy.OutputField(desc="How well this pattern generalizes to other contexts")
+        
+        return dspy.ChainOfThought(PatternAnalysis)
+    
+    @cached_property
+    def signature_optimizer(self):
+        import dspy
+        
+        class SignatureOptimization(dspy.Signature):
+            """Optimize DSPy signatures based on usage patterns"""
+            context_variations = dspy.InputField(desc="Different contexts where signature is used")
+            performance_data = dspy.InputField(desc="Performance metrics for different signature configurations")
+            usage_patterns = dspy.InputField(desc="Patterns of successful signature usage")
+            improved_signatures = dspy.OutputField(desc="Optimized signature definitions")
+            better_compositions = dspy.OutputField(desc="Improved module compositions")
+            usage_guidelines = dspy.OutputField(desc="Guidelines for optimal signature usage")
+        
+        return dspy.ChainOfThought(SignatureOptimization)
+    
+    @cached_property
+    def insights_generator(self):
+        import dspy
+        
+        class CommunityInsights(dspy.Signature):
+            """Generate insights from community usage data"""
+            common_challenges = dspy.InputField(desc="Common challenges and failure patterns")
+            success_metrics = dspy.InputField(desc="Success metrics and performance data")
+            aggregated_patterns = dspy.InputField(desc="Aggregated patterns from community usage")
+            community_insights = dspy.OutputField(desc="Insights about effective DSPy usage patterns")
+            best_practices = dspy.OutputField(desc="Community-derived best practices")
+            improvement_recommendations = dspy.OutputField(desc="Recommendations for framework improvements")
+        
+        return dspy.ChainOfThought(CommunityInsights)
     
     def record_successful_interaction(self, 
                                     signature_type: str,
@@ -104,31 +272,80 @@ class CommunityPatternLearning:
                                     outputs: Dict[str, Any],
                                     success_metrics: Dict[str, float]):
         """Record a successful interaction for pattern learning"""
+        # Anonymizing, hashing and persisting are deferred to _flush_pending
+        # Interned: the vocabulary is tiny, and every grouping keys on these
+        self._pending.append((sys.intern(signature_type), sys.intern(context_type),
+                              dict(inputs), dict(outputs),
+                              dict(success_metrics), time.time_ns()))
+        if len(self._pending) >= self.pending_limit:
+            self._flush_pending(analyze=True)
+    
+    def _flush_pending(self, analyze: bool = False):
+        """Turn buffered interactions into patterns and persist them in one write
+        
+        Only the write path passes analyze=True; reading never starts an LLM analysis.
+        """
+        if not self._pending:
+            return
         
+        with self._flush_lock:
+            touched: Dict[str, InteractionPattern] = {}
+            while self._pending:
+                pattern = self._apply_interaction(*self._pending.popleft())
+                touched[pattern.pattern_id] = pattern
+            
+            self._patterns_version += 1
+            self._append_local_patterns(list(touched.values()))
+            if self._rekeyed:
+                # The log still holds re-keyed patterns under their legacy ids
+                self._rekeyed = False
+                self._compact_local_patterns()
+            self._flushes_since_analysis += 1
+        
+        if analyze and self._flushes_since_analysis >= self.analyze_every:
+            self._flushes_since_analysis = 0
+            self._analyze_local_patterns()
+    
+    def _apply_interaction(self, signature_type: str, context_type: str,
+                           inputs: Dict[str, Any], outputs: Dict[str, Any],
+                           success_metrics: Dict[str, float],
+                           recorded_at: int) -> InteractionPattern:
+        """Fold one recorded interaction into the local patterns"""
         # Anonymize the interaction
-        anonymized_input = self._anonymize_content(inputs)
-        anonymized_output = self._anonymize_content(outputs)
+        input_str = _scrub_content(inputs)
+        output_str = _scrub_content(outputs)
+        anonymized_input = self._hash_content(input_str)
+        anonymized_output = self._hash_content(output_str)
         
         # Create pattern ID
         pattern_content = f"{signature_type}_{context_type}_{anonymized_input}_{anonymized_output}"
-        pattern_id = hashlib.sha256(pattern_content.encode()).hexdigest()[:16]
+        pattern_id = _fast_hash(pattern_content.encode())
+        
+        pattern = self.local_patterns.get(pattern_id)
+        if pattern is None and self._legacy_count:
+            pattern = self._rekey_legacy_pattern(
+                signature_type, context_type, input_str, output_str,
+                pattern_id, anonymized_input, anonymized_output
+            )
         
         # Check if pattern already exists
-        if pattern_id in self.local_patterns:
+        if pattern is not None:
             # Update existing pattern
-            pattern = self.local_patterns[pattern_id]
             pattern.usage_count += 1
-            pattern.last_used = datetime.now()
+            pattern.last_used = recorded_at
             
             # Update success metrics (running average)
             for key, value in success_metrics.items():
                 if key in pattern.success_metrics:
                     # Running average
+                    previous = pattern.success_metrics[key]
                     pattern.success_metrics[key] = (
-                        pattern.success_metrics[key] * (pattern.usage_count - 1) + value
+                        previous * (pattern.usage_count - 1) + value
                     ) / pattern.usage_count
+                    self._metric_sums[key] += pattern.success_metrics[key] - previous
                 else:
                     pattern.success_metrics[key] = value
+                    self._track_metrics({key: value})
         else:
             # Create new pattern
             pattern = InteractionPattern(
@@ -139,86 +356,176 @@ class CommunityPatternLearning:
                 output_pattern=anonymized_output,
                 success_metrics=success_metrics,
                 usage_count=1,
-                created_at=datetime.now(),
-                last_used=datetime.now()
+                created_at=recorded_at,
+                last_used=recorded_at
             )
             self.local_patterns[pattern_id] = pattern
+            self._by_signature[signature_type].append(pattern)
+            self._track_metrics(success_metrics)
         
-        self._save_patterns()
-        
-        # Analyze patterns if we have enough data
-        if len(self.local_patterns) % 10 == 0:  # Every 10 new patterns
-            self._analyze_local_patterns()
+        return pattern
+    
+    def _rekey_legacy_pattern(self, signature_type: str, context_type: str,
+                              input_str: str, output_str: str, pattern_id: str,
+                              anonymized_input: str, anonymized_output: str) -> Optional[InteractionPattern]:
+        """Move the migrated pattern matching this interaction, if any, under its current id"""
+        salt = self.anonymization_salt
+        legacy_content = (f"{signature_type}_{context_type}_"
+                          f"{_legacy_anonymized(input_str, salt)}_{_legacy_anonymized(output_str, salt)}")
+        legacy_id = _LEGACY_PREFIX + hashlib.sha256(legacy_content.encode()).hexdigest()[:16]
+        
+        pattern = self.local_patterns.pop(legacy_id, None)
+        if pattern is None:
+            return None
+        
+        pattern.pattern_id = pattern_id
+        pattern.input_pattern = anonymized_input
+        pattern.output_pattern = anonymized_output
+        self.local_patterns[pattern_id] = pattern
+        self._legacy_count -= 1
+        self._rekeyed = True
+        return pattern
     
     def get_optimization_suggestions(self, signature_type: str) -> Dict[str, Any]:
         """Get optimization suggestions for a signature type"""
+        self._flush_pending(analyze=False)
         
-        # Filter patterns for this signature type
-        relevant_patterns = [
-            p for p in self.local_patterns.values() 
-            if p.signature_type == signature_type
-        ]
+        relevant_patterns = self._by_signature.get(signature_type, [])
         
         if len(relevant_patterns) < 3:
             return {'suggestions': 'Insufficient data for optimization'}
         
-        # Analyze patterns
+        # Analyze patterns; an unchanged pattern set reuses the stored analysis
         pattern_data = self._prepare_pattern_data(relevant_patterns)
+        cache = get_signature_cache()
+        model = active_model_name()
+        
+        cached = cache.get(_OPTIMIZATION_SIGNATURE, pattern_data, model)
+        if cached is not None:
+            return {**cached, 'pattern_count': len(relevant_patterns)}
         
         try:
+            start_time = time.time()
             optimization = self.signature_optimizer(
                 usage_patterns=pattern_data['usage_patterns'],
                 performance_data=pattern_data['performance_data'],
                 context_variations=pattern_data['context_variations']
             )
             
-            return {
-                'improved_signatures': optimization.improved_signatures,
-                'better_compositions': optimization.better_compositions,
-                'usage_guidelines': optimization.usage_guidelines,
-                'pattern_count': len(relevant_patterns)
-            }
+            suggestions = self._format_suggestions(optimization)
+            cache.put(_OPTIMIZATION_SIGNATURE, pattern_data, suggestions, model, time.time() - start_time)
+            return {**suggestions, 'pattern_count': len(relevant_patterns)}
             
         except Exception as e:
             return {'suggestions': f'Optimization analysis failed: {e}'}
     
+    def get_optimization_suggestions_bulk(self, signature_types: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get optimization suggestions for several signature types in one parallel batch"""
+        self._flush_pending(analyze=False)
+        
+        suggestions: Dict[str, Dict[str, Any]] = dict.fromkeys(signature_types)
+        cache = get_signature_cache()
+        model = active_model_name()
+        eligible = []
+        for signature_type in suggestions:
+            relevant_patterns = self._by_signature.get(signature_type, [])
+            if len(relevant_patterns) < 3:
+                suggestions[signature_type] = {'suggestions': 'Insufficient data for optimization'}
+                continue
+            
+            pattern_data = self._prepare_pattern_data(relevant_patterns)
+            cached = cache.get(_OPTIMIZATION_SIGNATURE, pattern_data, model)
+            if cached is not None:
+                suggestions[signature_type] = {**cached, 'pattern_count': len(relevant_patterns)}
+            else:
+                eligible.append((signature_type, len(relevant_patterns), pattern_data))
+        
+        if not eligible:
+            return suggestions
+        
+        import dspy
+        examples = [
+            dspy.Example(**pattern_data).with_inputs(
+                'usage_patterns', 'performance_data', 'context_variations'
+            )
+            for _, _, pattern_data in eligible
+        ]
+        try:
+            start_time = time.time()
+            results = self.signature_optimizer.batch(examples, num_threads=min(8, len(examples)))
+            elapsed = time.time() - start_time
+        except Exception as e:
+            for signature_type, _, _ in eligible:
+                suggestions[signature_type] = {'suggestions': f'Optimization analysis failed: {e}'}
+            return suggestions
+        
+        for (signature_type, pattern_count, pattern_data), optimization in zip(eligible, results):
+            if optimization is None:
+                # batch() yields None for examples that raised
+                suggestions[signature_type] = {'suggestions': 'Optimization analysis failed'}
+            else:
+                result = self._format_suggestions(optimization)
+                cache.put(_OPTIMIZATION_SIGNATURE, pattern_data, result, model, elapsed)
+                suggestions[signature_type] = {**result, 'pattern_count': pattern_count}
+        return suggestions
+    
     def analyze_community_insights(self) -> Dict[str, Any]:
         """Generate insights from community patterns"""
+        self._flush_pending(analyze=False)
         
-        all_patterns = list(self.local_patterns.values()) + list(self.community_patterns.values())
+        stats = self._pattern_stats('all')
         
-        if len(all_patterns) < 5:
+        if stats.total < 5:
             return {'insights': 'Insufficient community data'}
         
         # Aggregate patterns by type
-        aggregated = self._aggregate_patterns(all_patterns)
-        success_metrics = self._calculate_success_metrics(all_patterns)
-        challenges = self._identify_challenges(all_patterns)
+        aggregated = self._aggregate_patterns(stats)
+        success_metrics = self._calculate_success_metrics()
+        challenges = self._identify_challenges(stats)
+        
+        insight_inputs = {
+            'aggregated_patterns': _encode_prompt(aggregated),
+            'success_metrics': _encode_prompt(success_metrics),
+            'common_challenges': _encode_prompt(challenges)
+        }
+        counts = {
+            'pattern_count': stats.total,
+            'community_size': len(self.community_patterns)
+        }
+        cache = get_signature_cache()
+        model = active_model_name()
+        
+        cached = cache.get(_INSIGHTS_SIGNATURE, insight_inputs, model)
+        if cached is not None:
+            return {**cached, **counts}
         
         try:
-            insights = self.insights_generator(
-                aggregated_patterns=json.dumps(aggregated),
-                success_metrics=json.dumps(success_metrics),
-                common_challenges=json.dumps(challenges)
-            )
+            start_time = time.time()
+            insights = self.insights_generator(**insight_inputs)
             
-            return {
+            result = {
                 'insights': insights.community_insights,
                 'best_practices': insights.best_practices,
-                'improvements': insights.improvement_recommendations,
-                'pattern_count': len(all_patterns),
-                'community_size': len(self.community_patterns)
+                'improvements': insights.improvement_recommendations
             }
+            cache.put(_INSIGHTS_SIGNATURE, insight_inputs, result, model, time.time() - start_time)
+            return {**result, **counts}
             
         except Exception as e:
             return {'insights': f'Community analysis failed: {e}'}
     
-    def share_patterns_anonymously(self) -> Dict[str, Any]:
-        """Share anonymized patterns with community (if enabled)"""
+    def share_patterns_anonymously(self, export_format: str = 'json') -> Dict[str, Any]:
+        """Share anonymized patterns with community (if enabled)
+        
+        export_format='parquet' writes a zstd-compressed columnar file when
+        pyarrow is installed, and falls back to JSON otherwise.
+        """
         
         if not self.enable_sharing:
             return {'shared': False, 'reason': 'Sharing disabled'}
         
+        self._flush_pending(analyze=False)
+        
         # Select high-quality patterns for sharing
         shareable_patterns = [
             p for p in self.local_patterns.values()
@@ -245,8 +552,11 @@ class CommunityPatternLearning:
         # For now, we'll save to a local "shared" file
         shared_file = self.cache_dir / "shared_patterns.json"
         try:
-            with open(shared_file, 'w') as f:
-                json.dump(shared_data, f, indent=2)
+            if export_format == 'parquet' and _write_shared_parquet(shared_data, shared_file.with_suffix('.parquet')):
+                shared_file = shared_file.with_suffix('.parquet')
+            else:
+                with open(shared_file, 'w') as f:
+                    f.write(_encode_pattern(shared_data))
             
             return {
                 'shared': True,
@@ -268,38 +578,52 @@ class CommunityPatternLearning:
                 return {'imported': False, 'reason': 'Invalid community data'}
         else:
             # In real implementation, this would download from community repository
-            # For now, check if shared patterns exist locally
-            shared_file = self.cache_dir / "shared_patterns.json"
-            if not shared_file.exists():
+            # For now, check if shared patterns exist locally (newest export wins)
+            candidates = [
+                path for path in (self.cache_dir / "shared_patterns.json",
+                                  self.cache_dir / "shared_patterns.parquet")
+                if path.exists()
+            ]
+            if not candidates:
                 return {'imported': False, 'reason': 'No community patterns available'}
+            shared_file = max(candidates, key=lambda path: path.stat().st_mtime)
             
             try:
-                with open(shared_file, 'r') as f:
-                    patterns_data = json.load(f)
+                if shared_file.suffix == '.parquet':
+                    patterns_data = _read_shared_parquet(shared_file)
+                else:
+                    with open(shared_file, 'r') as f:
+                        patterns_data = json.load(f)
             except:
                 return {'imported': False, 'reason': 'Could not load community patterns'}
         
         # Import patterns
         imported_count = 0
+        imported_at = time.time_ns()
         for pattern_data in patterns_data:
             pattern_id = f"community_{int(time.time())}_{imported_count}"
             
             community_pattern = InteractionPattern(
                 pattern_id=pattern_id,
-                signature_type=pattern_data['signature_type'],
-                context_type=pattern_data['context_type'],
+                signature_type=sys.intern(pattern_data['signature_type']),
+                context_type=sys.intern(pattern_data['context_type']),
                 input_pattern=pattern_data['input_pattern'],
                 output_pattern=pattern_data['output_pattern'],
                 success_metrics=pattern_data['success_metrics'],
                 usage_count=pattern_data['usage_count'],
-                created_at=datetime.now(),
-                last_used=datetime.now()
+                created_at=imported_at,
+                last_used=imported_at
             )
             
+            replaced = self.community_patterns.get(pattern_id)
+            if replaced is not None:
+                self._track_metrics(replaced.success_metrics, -1)
             self.community_patterns[pattern_id] = community_pattern
+            self._track_metrics(community_pattern.success_metrics)
             imported_count += 1
         
-        self._save_patterns()
+        self._patterns_version += 1
+        self._save_community_patterns()
         
         return {
             'imported': True,
@@ -309,97 +633,85 @@ class CommunityPatternLearning:
     
     def get_pattern_statistics(self) -> Dict[str, Any]:
         """Get statistics about learned patterns"""
+        self._flush_pending(analyze=False)
         
-        local_by_type = {}
-        community_by_type = {}
-        
-        for pattern in self.local_patterns.values():
-            sig_type = pattern.signature_type
-            local_by_type[sig_type] = local_by_type.get(sig_type, 0) + 1
-        
-        for pattern in self.community_patterns.values():
-            sig_type = pattern.signature_type
-            community_by_type[sig_type] = community_by_type.get(sig_type, 0) + 1
+        local = self._pattern_stats('local')
+        community = self._pattern_stats('community')
         
         return {
             'local_patterns': {
-                'total': len(self.local_patterns),
-                'by_type': local_by_type,
-                'avg_usage': sum(p.usage_count for p in self.local_patterns.values()) / len(self.local_patterns) if self.local_patterns else 0
+                'total': local.total,
+                'by_type': {k: v['count'] for k, v in local.by_signature.items()},
+                'avg_usage': local.total_usage / local.total if local.total else 0
             },
             'community_patterns': {
-                'total': len(self.community_patterns),
-                'by_type': community_by_type
+                'total': community.total,
+                'by_type': {k: v['count'] for k, v in community.by_signature.items()}
             },
             'sharing_enabled': self.enable_sharing,
             'total_patterns': len(self.local_patterns) + len(self.community_patterns)
         }
     
     # Private helper methods
+    @staticmethod
+    def _format_suggestions(optimization) -> Dict[str, Any]:
+        """Shape a signature optimizer prediction into a suggestions dict"""
+        return {
+            'improved_signatures': optimization.improved_signatures,
+            'better_compositions': optimization.better_compositions,
+            'usage_guidelines': optimization.usage_guidelines
+        }
+    
+    def _pattern_stats(self, scope: str) -> PatternStats:
+        """Single-pass aggregates for 'local', 'community' or 'all' patterns"""
+        cached = self._stats_cache.get(scope)
+        if cached is not None and cached[0] == self._patterns_version:
+            return cached[1]
+        
+        if scope == 'local':
+            patterns = self.local_patterns.values()
+        elif scope == 'community':
+            patterns = self.community_patterns.values()
+        else:
+            patterns = [*self.local_patterns.values(), *self.community_patterns.values()]
+        
+        stats = _scan_patterns(patterns)
+        self._stats_cache[scope] = (self._patterns_version, stats)
+        return stats
+    
     def _get_anonymization_salt(self) -> str:
         """Get or create anonymization salt"""
-        salt_file = self.cache_dir / "anonymization_salt"
-        
-        if salt_file.exists():
-            try:
-                with open(salt_file, 'r') as f:
-                    return f.read().strip()
-            except:
-                pass
-        
-        # Generate new salt
-        salt = hashlib.sha256(str(time.time()).encode()).hexdigest()[:16]
-        
-        try:
-            with open(salt_file, 'w') as f:
-                f.write(salt)
-        except:
-            pass
-        
-        return salt
+        return _load_salt(str(self.cache_dir))
     
     def _anonymize_content(self, content: Dict[str, Any]) -> str:
         """Anonymize content while preserving structure"""
-        
-        # Convert to string for processing
-        content_str = json.dumps(content, sort_keys=True)
-        
-        # Remove potential personal information
-        import re
-        
-        # Remove email addresses
-        content_str = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', content_str)
-        
-        # Remove URLs
-        content_str = re.sub(r'https?://[^\s]+', '[URL]', content_str)
-        
-        # Remove file paths
-        content_str = re.sub(r'/[^\s]*', '[PATH]', content_str)
-        
-        # Replace long strings with placeholders
-        content_str = re.sub(r'"[^"]{50,}"', '"[LONG_STRING]"', content_str)
-        
-        # Hash with salt for consistent anonymization
-        content_hash = hashlib.sha256((content_str + self.anonymization_salt).encode()).hexdigest()[:32]
+        return self._hash_content(_scrub_content(content))
+    
+    def _hash_content(self, content_str: str) -> str:
+        """Anonymized form of already-scrubbed content"""
+        # Keyed hash with the salt for consistent anonymization (blake2b keys cap at 64 bytes)
+        content_hash = hashlib.blake2b(
+            content_str.encode(), key=self.anonymization_salt.encode()[:64], digest_size=16
+        ).hexdigest()
         
         # Return structured anonymization
         return f"anonymized_{len(content_str)}_{content_hash}"
     
     def _double_anonymize(self, content: str) -> str:
         """Apply additional anonymization for community sharing"""
-        return hashlib.sha256((content + "community_salt").encode()).hexdigest()[:24]
+        return hashlib.blake2b(content.encode(), key=b"community_salt", digest_size=12).hexdigest()
     
     def _load_patterns(self):
         """Load patterns from storage"""
         
-        # Load local patterns
+        self._migrate_legacy_patterns(self.local_patterns_file.with_suffix('.json'))
+        
+        # Load local patterns; a later line for the same pattern_id overrides earlier ones
         try:
             if self.local_patterns_file.exists():
-                with open(self.local_patterns_file, 'r') as f:
-                    data = json.load(f)
-                    self.local_patterns = {
-                        k: InteractionPattern.from_dict(v) for k, v in data.items()
-                    }
+                for data in self._read_pattern_log(self.local_patterns_file):
+                    pattern = InteractionPattern.from_dict(data)
+                    self.local_patterns[pattern.pattern_id] = pattern
         except Exception as e:
             print(f"⚠️ Could not load local patterns: {e}")
         
@@ -413,23 +725,91 @@ class CommunityPatternLearning:
                     }
         except Exception as e:
             print(f"⚠️ Could not load community patterns: {e}")
+        
+        for pattern in self.local_patterns.values():
+            self._by_signature[pattern.signature_type].append(pattern)
+        self._legacy_count = sum(pid.startswith(_LEGACY_PREFIX) for pid in self.local_patterns)
+        for pattern in (*self.local_patterns.values(), *self.community_patterns.values()):
+            self._track_metrics(pattern.success_metrics)
+    
+    def _track_metrics(self, metrics: Dict[str, float], sign: int = 1):
+        """Add (or with sign=-1 remove) one pattern's metrics in the running totals"""
+        for metric, value in metrics.items():
+            self._metric_sums[metric] = self._metric_sums.get(metric, 0.0) + sign * value
+            self._metric_counts[metric] = self._metric_counts.get(metric, 0) + sign
+    
+    @staticmethod
+    def _read_pattern_log(path: Path) -> List[Dict[str, Any]]:
+        """Parse a JSONL pattern log with one decoder call, skipping torn lines if needed"""
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        try:
+            return json.loads('[' + ','.join(lines) + ']')
+        except ValueError:
+            # A write interrupted mid-line; keep every record that still parses
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+            return records
     
-    def _save_patterns(self):
-        """Save patterns to storage"""
+    def _append_local_patterns(self, patterns: List[InteractionPattern]):
+        """Append the current state of the given patterns to the local log"""
+        try:
+            with open(self.local_patterns_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(_encode_pattern(pattern.to_dict()) + '\n' for pattern in patterns))
+            self._appends_since_compact += len(patterns)
+        except Exception as e:
+            _warn_throttled(f"Could not save patterns: {e}")
+            return
         
+        if self._appends_since_compact >= self.compact_every:
+            self._compact_local_patterns()
+    
+    def _compact_local_patterns(self):
+        """Rewrite the local log with one line per pattern"""
+        if not self._appends_since_compact:
+            return
+        try:
+            tmp_path = self.local_patterns_file.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(
+                    _encode_pattern(pattern.to_dict()) + '\n'
+                    for pattern in self.local_patterns.values()
+                ))
+            os.replace(tmp_path, self.local_patterns_file)
+            self._appends_since_compact = 0
+        except Exception as e:
+            _warn_throttled(f"Could not compact patterns: {e}")
+    
+    def _save_community_patterns(self):
+        """Save community patterns to storage"""
+        try:
+            with open(self.community_patterns_file, 'w', encoding='utf-8') as f:
+                f.write(_encode_pattern({k: v.to_dict() for k, v in self.community_patterns.items()}))
+        except Exception as e:
+            _warn_throttled(f"Could not save patterns: {e}")
+    
+    def _migrate_legacy_patterns(self, legacy_file: Path):
+        """Move patterns from the old whole-file JSON store into the JSONL log"""
+        if not legacy_file.exists():
+            return
         try:
-            # Save local patterns
-            with open(self.local_patterns_file, 'w') as f:
-                data = {k: v.to_dict() for k, v in self.local_patterns.items()}
-                json.dump(data, f, indent=2)
+            with open(legacy_file, 'r') as f:
+                data = json.load(f)
+            
+            # Ids are marked so a recurring interaction can find and re-key its pattern
+            with open(self.local_patterns_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(
+                    _encode_pattern({**v, 'pattern_id': _LEGACY_PREFIX + v['pattern_id']}) + '\n'
+                    for v in data.values()
+                ))
+            legacy_file.unlink()
             
-            # Save community patterns
-            with open(self.community_patterns_file, 'w') as f:
-                data = {k: v.to_dict() for k, v in self.community_patterns.items()}
-                json.dump(data, f, indent=2)
-                
         except Exception as e:
-            print(f"⚠️ Could not save patterns: {e}")
+            print(f"⚠️ Could not migrate local patterns: {e}")
     
     def _analyze_local_patterns(self):
         """Analyze local patterns for insights"""
@@ -438,32 +818,35 @@ class CommunityPatternLearning:
             return
         
         try:
-            # Group patterns by signature type
-            by_signature = {}
-            for pattern in self.local_patterns.values():
-                sig_type = pattern.signature_type
-                if sig_type not in by_signature:
-                    by_signature[sig_type] = []
-                by_signature[sig_type].append(pattern)
+            # Analyze every signature type with enough data in one parallel batch
+            eligible = [(sig_type, patterns) for sig_type, patterns in self._by_signature.items()
+                        if len(patterns) >= 3]
+            if not eligible:
+                return
             
-            # Analyze each signature type
-            for sig_type, patterns in by_signature.items():
-                if len(patterns) >= 3:
-                    analysis_data = self._prepare_pattern_data(patterns)
-                    
-                    analysis = self.pattern_analyzer(
-                        successful_interactions=analysis_data['usage_patterns'],
-                        context_type=sig_type,
-                        usage_frequency=str(len(patterns))
-                    )
-                    
-                    # Cache the analysis
-                    self.optimization_cache[sig_type] = {
-                        'patterns': analysis.reusable_patterns,
-                        'opportunities': analysis.optimization_opportunities,
-                        'generalization': analysis.generalization_potential,
-                        'analyzed_at': datetime.now().isoformat()
-                    }
+            import dspy
+            examples = [
+                dspy.Example(
+                    successful_interactions=self._prepare_pattern_data(patterns)['usage_patterns'],
+                    context_type=sig_type,
+                    usage_frequency=str(len(patterns))
+                ).with_inputs('successful_interactions', 'context_type', 'usage_frequency')
+                for sig_type, patterns in eligible
+            ]
+            analyses = self.pattern_analyzer.batch(examples, num_threads=min(8, len(examples)))
+            
+            analyzed_at = datetime.now().isoformat()
+            for (sig_type, _), analysis in zip(eligible, analyses):
+                if analysis is None:
+                    continue
+                
+                # Cache the analysis
+                self.optimization_cache[sig_type] = {
+                    'patterns': analysis.reusable_patterns,
+                    'opportunities': analysis.optimization_opportunities,
+                    'generalization': analysis.generalization_potential,
+                    'analyzed_at': analyzed_at
+                }
         
         except Exception as e:
             print(f"⚠️ Pattern analysis failed: {e}")
@@ -485,75 +868,40 @@ class CommunityPatternLearning:
             performance_data.append(pattern.success_metrics)
             context_variations.add(pattern.context_type)
         
+        # Stable serialization so identical pattern sets give identical prompts (and LM cache keys)
         return {
-            'usage_patterns': json.dumps(usage_patterns),
-            'performance_data': json.dumps(performance_data),
-            'context_variations': json.dumps(list(context_variations))
+            'usage_patterns': _encode_prompt(usage_patterns),
+            'performance_data': _encode_prompt(performance_data),
+            'context_variations': _encode_prompt(sorted(context_variations))
         }
     
-    def _aggregate_patterns(self, patterns: List[InteractionPattern]) -> Dict[str, Any]:
+    def _aggregate_patterns(self, stats: PatternStats) -> Dict[str, Any]:
         """Aggregate patterns for community analysis"""
-        
-        by_signature = {}
-        by_context = {}
-        
-        for pattern in patterns:
-            # Group by signature type
-            sig_type = pattern.signature_type
-            if sig_type not in by_signature:
-                by_signature[sig_type] = {'count': 0, 'total_usage': 0}
-            by_signature[sig_type]['count'] += 1
-            by_signature[sig_type]['total_usage'] += pattern.usage_count
-            
-            # Group by context type
-            ctx_type = pattern.context_type
-            if ctx_type not in by_context:
-                by_context[ctx_type] = {'count': 0, 'total_usage': 0}
-            by_context[ctx_type]['count'] += 1
-            by_context[ctx_type]['total_usage'] += pattern.usage_count
-        
         return {
-            'by_signature': by_signature,
-            'by_context': by_context,
-            'total_patterns': len(patterns)
+            'by_signature': stats.by_signature,
+            'by_context': stats.by_context,
+            'total_patterns': stats.total
         }
     
-    def _calculate_success_metrics(self, patterns: List[InteractionPattern]) -> Dict[str, float]:
-        """Calculate aggregate success metrics"""
-        
-        all_metrics = {}
-        
-        for pattern in patterns:
-            for metric, value in pattern.success_metrics.items():
-                if metric not in all_metrics:
-                    all_metrics[metric] = []
-                all_metrics[metric].append(value)
-        
-        # Calculate averages
-        avg_metrics = {}
-        for metric, values in all_metrics.items():
-            avg_metrics[metric] = sum(values) / len(values)
-        
-        return avg_metrics
+    def _calculate_success_metrics(self) -> Dict[str, float]:
+        """Calculate aggregate success metrics from the running totals"""
+        return {
+            metric: total / self._metric_counts[metric]
+            for metric, total in self._metric_sums.items()
+            if self._metric_counts[metric]
+        }
     
-    def _identify_challenges(self, patterns: List[InteractionPattern]) -> List[str]:
+    def _identify_challenges(self, stats: PatternStats) -> List[str]:
         """Identify common challenges from patterns"""
         
         challenges = []
         
         # Analyze success metrics for patterns
-        low_quality_count = sum(
-            1 for p in patterns 
-            if p.success_metrics.get('quality_score', 1.0) < 0.7
-        )
-        
-        if low_quality_count > len(patterns) * 0.2:
+        if stats.low_quality_count > stats.total * 0.2:
             challenges.append("Quality consistency across different contexts")
         
         # Analyze usage patterns
-        single_use_count = sum(1 for p in patterns if p.usage_count == 1)
-        
-        if single_use_count > len(patterns) * 0.5:
+        if stats.single_use_count > stats.total * 0.5:
             challenges.append("Pattern reusability and generalization")
         
         # Add generic challenges
@@ -565,6 +913,73 @@ class CommunityPatternLearning:
         
         return challenges[:5]  # Top 5 challenges
 
+def _read_salt(salt_file: Path) -> Optional[str]:
+    """Salt stored in `salt_file`, or None if missing or unreadable"""
+    try:
+        # Opening directly (no exists() probe) saves a stat per lookup
+        with open(salt_file, 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+@lru_cache(maxsize=4)
+def _load_salt(cache_dir: str) -> str:
+    """Read (or create) the user's anonymization salt once per process"""
+    # The salt is a secret: it lives in ~/.atlas (0600), never inside a project checkout
+    try:
+        salt_file = atlas_home() / "anonymization_salt"
+    except OSError:
+        return _read_salt(Path(cache_dir) / "anonymization_salt") or os.urandom(8).hex()
+    
+    salt = _read_salt(salt_file)
+    if salt is not None:
+        return salt
+    
+    # Carry over a salt from the old per-project location: re-keying migrated patterns
+    # needs the salt their legacy hashes were computed with
+    legacy_file = Path(cache_dir) / "anonymization_salt"
+    salt = _read_salt(legacy_file) or os.urandom(8).hex()
+    
+    if write_private_file(salt_file, salt):
+        try:
+            legacy_file.unlink()
+        except OSError:
+            pass
+        return salt
+    # Another process created it first
+    return _read_salt(salt_file) or salt
+
+def _write_shared_parquet(shared_data: List[Dict[str, Any]], path: Path) -> bool:
+    """Write shared patterns as Parquet; False if pyarrow is unavailable"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("⚠️ pyarrow not installed, sharing patterns as JSON")
+        return False
+    
+    schema = pa.schema([
+        ('signature_type', pa.string()),
+        ('context_type', pa.string()),
+        ('input_pattern', pa.string()),
+        ('output_pattern', pa.string()),
+        ('success_metrics', pa.map_(pa.string(), pa.float64())),
+        ('usage_count', pa.int32()),
+    ])
+    rows = [{**row, 'success_metrics': list(row['success_metrics'].items())} for row in shared_data]
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), path, compression='zstd')
+    return True
+
+def _read_shared_parquet(path: Path) -> List[Dict[str, Any]]:
+    """Read shared patterns written by _write_shared_parquet"""
+    import pyarrow.parquet as pq
+    
+    rows = pq.read_table(path).to_pylist()
+    for row in rows:
+        # Map columns come back as (key, value) pairs
+        row['success_metrics'] = dict(row['success_metrics'] or ())
+    return rows
+
 # Global instance
 _community_learning = None
 
@@ -591,10 +1006,10 @@ def get_community_insights() -> Dict[str, Any]:
     learner = get_community_learning()
     return learner.analyze_community_insights()
 
-def share_patterns() -> Dict[str, Any]:
+def share_patterns(export_format: str = 'json') -> Dict[str, Any]:
     """Share patterns with community"""
     learner = get_community_learning()
-    return learner.share_patterns_anonymously()
+    return learner.share_patterns_anonymously(export_format)
 
 def import_patterns(data: Optional[str] = None) -> Dict[str, Any]:
     """Import community patterns"""
@@ -4,10 +4,12 @@ Core engine for systematic programming with free models
 """
 
 import os
+import atexit
 import dspy
 from typing import Optional, Dict, Any
 import json
 import time
+import threading
 from .cache import get_signature_cache
 
 class AtlasCoderEngine:
@@ -131,14 +133,37 @@ class AtlasCoderEngine:
             self.cache = {}
             
         print(f"💾 Cache initialized: {len(self.cache)} entries")
+        
+        # Changes are written at most once per flush_interval seconds, plus at exit
+        self.flush_interval = 5.0
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._cache_lock = threading.Lock()
+        atexit.register(self.flush_cache)
     
     def save_cache(self):
-        """Save optimization cache to disk"""
-        try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f, indent=2)
-        except Exception as e:
-            print(f"⚠️ Cache save failed: {e}")
+        """Record that the optimization cache changed and write it if the flush interval has passed"""
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush_cache()
+    
+    def flush_cache(self):
+        """Write the optimization cache to disk if it has unsaved changes"""
+        with self._cache_lock:
+            if not self._dirty:
+                return
+            # Cleared before writing so a change made during the write is flushed next time
+            self._dirty = False
+            try:
+                # Write-then-rename so a crash never leaves a torn cache file
+                tmp_file = self.cache_file + ".tmp"
+                with open(tmp_file, 'w') as f:
+                    json.dump(self.cache, f, indent=2)
+                os.replace(tmp_file, self.cache_file)
+            except Exception as e:
+                self._dirty = True
+                print(f"⚠️ Cache save failed: {e}")
+            self._last_flush = time.monotonic()
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current model configuration"""
@@ -177,16 +202,23 @@ class AtlasCoderEngine:
 
 # Global engine instance
 _engine = None
+_engine_lock = threading.Lock()
 
 def get_engine() -> AtlasCoderEngine:
     """Get or create the global DSPy engine instance"""
     global _engine
-    if _engine is None:
-        _engine = AtlasCoderEngine()
-    return _engine
+    engine = _engine
+    if engine is None:
+        # Double-checked so concurrent first calls (e.g. batch workers) build a single engine
+        with _engine_lock:
+            if _engine is None:
+                _engine = AtlasCoderEngine()
+            engine = _engine
+    return engine
 
 def initialize_engine(model: Optional[str] = None) -> AtlasCoderEngine:
     """Initialize the DSPy engine with specific model"""
     global _engine
-    _engine = AtlasCoderEngine(model=model)
-    return _engine
\ No newline at end of file
+    with _engine_lock:
+        _engine = AtlasCoderEngine(model=model)
+        return _engine
\ No newline at end of file
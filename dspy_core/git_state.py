@@ -0,0 +1,60 @@
+"""
+Git state reader shared by the agentic and Claude Code parity modules
+Porcelain status and a short oneline log, read in-process when pygit2 is installed
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Optional, Tuple
+
+def read_git_state(root: Path) -> Tuple[Optional[str], Optional[str]]:
+    """Return (git status --porcelain, git log --oneline -5) output for root; None where unavailable"""
+    try:
+        import pygit2
+        return _pygit2_state(pygit2, root)
+    except Exception:
+        pass
+    
+    results = []
+    for cmd in (['git', 'status', '--porcelain'], ['git', 'log', '--oneline', '-5']):
+        try:
+            proc = subprocess.run(
+                cmd,
+                cwd=root,
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            results.append(proc.stdout if proc.returncode == 0 else None)
+        except:
+            results.append(None)
+    return results[0], results[1]
+
+def _pygit2_state(pygit2, root: Path) -> Tuple[str, str]:
+    """Render porcelain-style status and oneline log from a pygit2 repository"""
+    repo = pygit2.Repository(pygit2.discover_repository(str(root)))
+
+    index_codes = ((pygit2.GIT_STATUS_INDEX_NEW, 'A'), (pygit2.GIT_STATUS_INDEX_MODIFIED, 'M'),
+                   (pygit2.GIT_STATUS_INDEX_DELETED, 'D'), (pygit2.GIT_STATUS_INDEX_RENAMED, 'R'))
+    worktree_codes = ((pygit2.GIT_STATUS_WT_MODIFIED, 'M'), (pygit2.GIT_STATUS_WT_DELETED, 'D'),
+                      (pygit2.GIT_STATUS_WT_RENAMED, 'R'))
+    status_lines = []
+    for path, flags in sorted(repo.status().items()):
+        if flags & pygit2.GIT_STATUS_IGNORED:
+            continue
+        if flags & pygit2.GIT_STATUS_WT_NEW:
+            status_lines.append(f"?? {path}")
+            continue
+        x = next((code for flag, code in index_codes if flags & flag), ' ')
+        y = next((code for flag, code in worktree_codes if flags & flag), ' ')
+        status_lines.append(f"{x}{y} {path}")
+
+    log_lines = []
+    for commit in repo.walk(repo.head.target, pygit2.GIT_SORT_TIME):
+        log_lines.append(f"{commit.short_id} {commit.message.splitlines()[0] if commit.message else ''}")
+        if len(log_lines) >= 5:
+            break
+
+    status = '\n'.join(status_lines)
+    log = '\n'.join(log_lines)
+    return (status + '\n' if status else ''), (log + '\n' if log else '')
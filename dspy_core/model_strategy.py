@@ -6,11 +6,26 @@ Intelligent model selection for optimal cost/quality balance
 import os
 import time
 import json
+import atexit
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
+# Summed per (model, task type); each performance log line carries a delta of these.
+# Appended lines carry a unique 'id' so a line written twice (a retried append, a
+# re-run migration) is only counted once on replay
+_TOTAL_FIELDS = ('total_runs', 'successful_runs', 'total_quality', 'total_time', 'total_cost')
+
+def _encode_totals(model_name: str, task_type: str, stats: Dict[str, Any],
+                   observation_id: Optional[str] = None) -> str:
+    """One performance log line carrying the full totals for a model and task type"""
+    line = {'model': model_name, 'task_type': task_type}
+    if observation_id is not None:
+        line['id'] = observation_id
+    line.update((field, stats.get(field, 0)) for field in _TOTAL_FIELDS)
+    return json.dumps(line, separators=(',', ':')) + '\n'
+
 class ModelTier(Enum):
     """Model tiers based on cost and capability"""
     LOCAL_FREE = "local_free"
@@ -38,7 +53,24 @@ class HybridModelStrategy:
     
     def __init__(self):
         self.models = self._initialize_model_configs()
+        
+        # Performance history is an append-only JSONL log of per-run deltas, folded on load
+        self.performance_log = Path("./dspy_cache/model_performance.jsonl")
+        self._log_lines = 0
+        self._pending_observations: List[Dict[str, Any]] = []
         self.performance_cache = self._load_performance_cache()
+        
+        # Recorded runs are appended at most once per flush_interval seconds, plus at exit
+        self.flush_interval = 5.0
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush_performance_cache)
+        
+        # Ollama probe result is reused for ollama_ttl seconds over a keep-alive session
+        self.ollama_ttl = 30.0
+        self._ollama_available: Optional[bool] = None
+        self._ollama_checked_at = 0.0
+        self._http_session = None
+        
         self.fallback_chain = self._build_fallback_chain()
         
         # Current session tracking
@@ -146,24 +178,113 @@ class HybridModelStrategy:
     
     def _load_performance_cache(self) -> Dict[str, Dict[str, Any]]:
         """Load model performance data from previous runs"""
-        cache_file = Path("./dspy_cache/model_performance.json")
+        self._migrate_legacy_performance_cache(self.performance_log.with_suffix('.json'))
+        
+        cache: Dict[str, Dict[str, Any]] = {}
+        seen_ids = set()
         try:
-            if cache_file.exists():
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+            with open(self.performance_log, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        observation = json.loads(line)
+                        observation_id = observation.get('id')
+                        if observation_id not in seen_ids:
+                            self._fold_observation(cache, observation)
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        continue  # Torn or malformed line
+                    if observation_id is not None:
+                        seen_ids.add(observation_id)
+                    self._log_lines += 1
         except Exception:
-            pass
-        return {}
+            return {}
+        
+        if self._log_lines > 10 * self._performance_entries(cache):
+            self._compact_performance_log(cache)
+        return cache
+    
+    @staticmethod
+    def _fold_observation(cache: Dict[str, Dict[str, Any]], observation: Dict[str, Any]):
+        """Add one logged delta into the per-model, per-task totals"""
+        stats = cache.setdefault(observation['model'], {}).setdefault(observation['task_type'], {
+            'total_runs': 0,
+            'successful_runs': 0,
+            'total_quality': 0.0,
+            'total_time': 0.0,
+            'total_cost': 0.0
+        })
+        for field in _TOTAL_FIELDS:
+            stats[field] += observation.get(field, 0)
+        
+        # Calculate derived metrics
+        runs = stats['total_runs']
+        if runs:
+            stats['success_rate'] = stats['successful_runs'] / runs
+            stats['avg_quality'] = stats['total_quality'] / runs
+            stats['avg_time'] = stats['total_time'] / runs
+            stats['avg_cost'] = stats['total_cost'] / runs
+    
+    @staticmethod
+    def _performance_entries(cache: Dict[str, Dict[str, Any]]) -> int:
+        """Number of (model, task type) totals in a cache"""
+        return sum(len(tasks) for tasks in cache.values())
     
     def _save_performance_cache(self):
-        """Save model performance data"""
-        cache_file = Path("./dspy_cache/model_performance.json")
+        """Append pending performance observations to the log"""
+        pending = self._pending_observations
         try:
-            cache_file.parent.mkdir(exist_ok=True)
-            with open(cache_file, 'w') as f:
-                json.dump(self.performance_cache, f, indent=2)
+            if pending:
+                self.performance_log.parent.mkdir(exist_ok=True)
+                with open(self.performance_log, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(o, separators=(',', ':')) + '\n' for o in pending))
+                self._log_lines += len(pending)
+                self._pending_observations = []
         except Exception as e:
             print(f"⚠️ Performance cache save failed: {e}")
+        self._last_flush = time.monotonic()
+        
+        if self._log_lines > 10 * self._performance_entries(self.performance_cache):
+            self._compact_performance_log(self.performance_cache)
+    
+    def flush_performance_cache(self):
+        """Write pending performance data, if any"""
+        if self._pending_observations:
+            self._save_performance_cache()
+    
+    def _compact_performance_log(self, cache: Dict[str, Dict[str, Any]]):
+        """Rewrite the log with one totals line per model and task type"""
+        try:
+            tmp_path = self.performance_log.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(
+                    _encode_totals(model_name, task_type, stats)
+                    for model_name, tasks in cache.items()
+                    for task_type, stats in tasks.items()
+                ))
+            os.replace(tmp_path, self.performance_log)
+            self._log_lines = self._performance_entries(cache)
+            # The in-memory totals already include unwritten observations; appending
+            # them after the compacted totals would count them twice
+            self._pending_observations = []
+        except Exception as e:
+            print(f"⚠️ Performance cache compaction failed: {e}")
+    
+    def _migrate_legacy_performance_cache(self, legacy_file: Path):
+        """Move totals from the old whole-file JSON store into the JSONL log"""
+        if not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                data = json.load(f)
+            
+            with open(self.performance_log, 'a', encoding='utf-8') as f:
+                f.write(''.join(
+                    _encode_totals(model_name, task_type, stats, f"legacy:{model_name}:{task_type}")
+                    for model_name, tasks in data.items()
+                    for task_type, stats in tasks.items()
+                ))
+            legacy_file.unlink()
+        except Exception as e:
+            print(f"⚠️ Could not migrate performance cache: {e}")
     
     def _build_fallback_chain(self) -> List[str]:
         """Build intelligent fallback chain"""
@@ -190,12 +311,22 @@ class HybridModelStrategy:
     
     def _is_ollama_available(self) -> bool:
         """Check if Ollama is running locally"""
+        now = time.monotonic()
+        if self._ollama_available is not None and now - self._ollama_checked_at < self.ollama_ttl:
+            return self._ollama_available
+        
         try:
-            import requests
-            response = requests.get('http://localhost:11434/api/tags', timeout=2)
-            return response.status_code == 200
+            if self._http_session is None:
+                import requests
+                self._http_session = requests.Session()
+            response = self._http_session.get('http://localhost:11434/api/tags', timeout=2)
+            available = response.status_code == 200
         except:
-            return False
+            available = False
+        
+        self._ollama_available = available
+        self._ollama_checked_at = time.monotonic()
+        return available
     
     def select_model(self, 
                     task_complexity: float,
@@ -205,6 +336,11 @@ class HybridModelStrategy:
                     urgency: str = 'normal') -> str:
         """Choose optimal model for task based on multiple factors"""
         
+        # Loop invariants: evaluated once per selection, not per candidate
+        api_key_present = bool(os.getenv('OPENAI_API_KEY'))
+        ollama_up = self._is_ollama_available()
+        budget_inverse = 1.0 / budget_remaining if budget_remaining > 0 else 0.0
+        
         # Score each available model
         model_scores = {}
         
@@ -215,7 +351,7 @@ class HybridModelStrategy:
             model = self.models[model_name]
             score = self._calculate_model_score(
                 model, task_complexity, quality_requirement, 
-                budget_remaining, task_type, urgency
+                budget_inverse, task_type, urgency, api_key_present, ollama_up
             )
             
             if score > 0:  # Only consider viable models
@@ -239,10 +375,21 @@ class HybridModelStrategy:
                               model: ModelConfig,
                               task_complexity: float,
                               quality_requirement: float,
-                              budget_remaining: float,
+                              budget_inverse: float,
                               task_type: str,
-                              urgency: str) -> float:
-        """Calculate composite score for model selection"""
+                              urgency: str,
+                              api_key_present: bool,
+                              ollama_up: bool) -> float:
+        """Calculate composite score for model selection
+        
+        budget_inverse is 1 / remaining budget, or 0.0 when the budget is spent.
+        """
+        
+        # Availability check: unavailable models score zero
+        if model.requires_api_key and not api_key_present:
+            return 0.0
+        if model.tier == ModelTier.LOCAL_FREE and not ollama_up:
+            return 0.0
         
         # Base score from model quality
         quality_score = model.quality_score
@@ -259,11 +406,11 @@ class HybridModelStrategy:
         estimated_cost = self._estimate_task_cost(model, task_complexity)
         cost_penalty = 0.0
         
-        if model.requires_api_key and budget_remaining > 0:
-            cost_ratio = estimated_cost / budget_remaining
+        if model.requires_api_key and budget_inverse > 0:
+            cost_ratio = estimated_cost * budget_inverse
             if cost_ratio > 0.5:  # More than 50% of remaining budget
                 cost_penalty = cost_ratio * 0.3
-        elif model.requires_api_key and budget_remaining <= 0:
+        elif model.requires_api_key:
             cost_penalty = 1.0  # Can't afford
         
         # Speed bonus for urgent tasks
@@ -271,13 +418,6 @@ class HybridModelStrategy:
         if urgency == 'high':
             speed_bonus = model.speed_score * 0.1
         
-        # Availability check
-        availability_score = 1.0
-        if model.requires_api_key and not os.getenv('OPENAI_API_KEY'):
-            availability_score = 0.0
-        elif model.tier == ModelTier.LOCAL_FREE and not self._is_ollama_available():
-            availability_score = 0.0
-        
         # Historical performance adjustment
         historical_bonus = self._get_historical_performance_bonus(model.name, task_type)
         
@@ -287,7 +427,7 @@ class HybridModelStrategy:
                 complexity_match + 
                 speed_bonus + 
                 historical_bonus - 
-                cost_penalty) * availability_score
+                cost_penalty)
         
         return max(0.0, score)
     
@@ -338,33 +478,21 @@ class HybridModelStrategy:
                           cost: float):
         """Record model performance for future selection"""
         
-        if model_name not in self.performance_cache:
-            self.performance_cache[model_name] = {}
-        
-        if task_type not in self.performance_cache[model_name]:
-            self.performance_cache[model_name][task_type] = {
-                'total_runs': 0,
-                'successful_runs': 0,
-                'total_quality': 0.0,
-                'total_time': 0.0,
-                'total_cost': 0.0
-            }
-        
-        stats = self.performance_cache[model_name][task_type]
-        stats['total_runs'] += 1
-        if success:
-            stats['successful_runs'] += 1
-        stats['total_quality'] += quality_score
-        stats['total_time'] += execution_time
-        stats['total_cost'] += cost
-        
-        # Calculate derived metrics
-        stats['success_rate'] = stats['successful_runs'] / stats['total_runs']
-        stats['avg_quality'] = stats['total_quality'] / stats['total_runs']
-        stats['avg_time'] = stats['total_time'] / stats['total_runs']
-        stats['avg_cost'] = stats['total_cost'] / stats['total_runs']
+        observation = {
+            'id': os.urandom(8).hex(),
+            'model': model_name,
+            'task_type': task_type,
+            'total_runs': 1,
+            'successful_runs': 1 if success else 0,
+            'total_quality': quality_score,
+            'total_time': execution_time,
+            'total_cost': cost
+        }
+        self._fold_observation(self.performance_cache, observation)
         
-        self._save_performance_cache()
+        self._pending_observations.append(observation)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._save_performance_cache()
         self.total_cost += cost
     
     def get_model_recommendations(self, 
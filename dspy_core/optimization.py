@@ -7,6 +7,7 @@ import re
 import ast
 import json
 import time
+import threading
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
@@ -387,6 +388,10 @@ class CostTracker:
         self.daily_costs = self._load_daily_costs()
         self.session_metrics: List[CostMetrics] = []
         
+        # Cost log writes are coalesced: flush after this many recorded usages
+        self.flush_interval = 1
+        self._pending_writes = 0
+        
     def _load_daily_costs(self) -> Dict[str, float]:
         """Load daily cost tracking"""
         try:
@@ -405,6 +410,12 @@ class CostTracker:
         except Exception as e:
             print(f"⚠️ Cost log save failed: {e}")
     
+    def flush(self):
+        """Write any pending cost updates to disk"""
+        if self._pending_writes:
+            self._save_daily_costs()
+            self._pending_writes = 0
+    
     def record_usage(self, metrics: CostMetrics):
         """Record usage and update daily costs"""
         today = datetime.now().strftime('%Y-%m-%d')
@@ -415,7 +426,9 @@ class CostTracker:
         self.daily_costs[today] += metrics.cost_estimate
         self.session_metrics.append(metrics)
         
-        self._save_daily_costs()
+        self._pending_writes += 1
+        if self._pending_writes >= self.flush_interval:
+            self.flush()
         
         # Warn if approaching budget
         if self.daily_costs[today] > self.daily_budget * 0.8:
@@ -455,6 +468,7 @@ class CostTracker:
 _token_optimizer = None
 _progressive_complexity = None
 _cost_tracker = None
+_cost_tracker_lock = threading.Lock()
 
 def get_token_optimizer() -> TokenOptimizer:
     """Get global token optimizer instance"""
@@ -473,6 +487,11 @@ def get_progressive_complexity() -> ProgressiveComplexity:
 def get_cost_tracker() -> CostTracker:
     """Get global cost tracker instance"""
     global _cost_tracker
-    if _cost_tracker is None:
-        _cost_tracker = CostTracker()
-    return _cost_tracker
\ No newline at end of file
+    tracker = _cost_tracker
+    if tracker is None:
+        # Double-checked: workflow workers running in parallel read the budget
+        with _cost_tracker_lock:
+            if _cost_tracker is None:
+                _cost_tracker = CostTracker()
+            tracker = _cost_tracker
+    return tracker
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+User-level storage locations for Atlas Coder
+Secrets and caches that must not live inside a project checkout
+"""
+
+import os
+from pathlib import Path
+
+def atlas_home() -> Path:
+    """User-level Atlas directory (~/.atlas), created private to the user on first use"""
+    home = Path.home() / ".atlas"
+    home.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return home
+
+def write_private_file(path: Path, content: str) -> bool:
+    """Create `path` readable only by the user (0600); False if it already exists or can't be written"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except OSError:
+        return False
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+    return True
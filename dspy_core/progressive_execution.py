@@ -101,7 +101,7 @@ class ProgressiveExecutor:
                          level: ExecutionLevel) -> ExecutionResult:
         """Execute task at specific complexity level"""
         
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         
         # Get level configuration
         level_config = self.complexity_manager.complexity_levels[level.value]
@@ -118,7 +118,7 @@ class ProgressiveExecutor:
                 workflow_type, optimized_params, level_config, model
             )
             
-            execution_time = time.time() - start_time
+            execution_time = (time.monotonic_ns() - start_ns) / 1e9
             
             # Evaluate result quality
             quality_score = self._evaluate_quality(result, workflow_type, level)
@@ -160,7 +160,7 @@ class ProgressiveExecutor:
             )
             
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = (time.monotonic_ns() - start_ns) / 1e9
             print(f"❌ Execution failed at {level.value}: {e}")
             
             # Create failure result
@@ -247,9 +247,9 @@ class ProgressiveExecutor:
         timeout = level_config['timeout']
         
         # Execute with timeout (simplified - real implementation would need async)
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
         result = self.orchestrator.execute_workflow(workflow_type, **params)
-        execution_time = time.time() - start_time
+        execution_time = (time.monotonic_ns() - start_ns) / 1e9
         
         # Check timeout
         if execution_time > timeout:
@@ -4,6 +4,7 @@ Systematic composition of modules into powerful workflows
 """
 
 import dspy
+import threading
 from typing import Dict, Any, Optional, List
 from .modules import *
 from .engine import get_engine
@@ -332,10 +333,16 @@ class WorkflowOrchestrator:
 
 # Global orchestrator instance
 _orchestrator = None
+_orchestrator_lock = threading.Lock()
 
 def get_orchestrator() -> WorkflowOrchestrator:
     """Get or create the global workflow orchestrator"""
     global _orchestrator
-    if _orchestrator is None:
-        _orchestrator = WorkflowOrchestrator()
-    return _orchestrator
\ No newline at end of file
+    orchestrator = _orchestrator
+    if orchestrator is None:
+        # Double-checked so concurrent first calls build a single orchestrator
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                _orchestrator = WorkflowOrchestrator()
+            orchestrator = _orchestrator
+    return orchestrator
\ No newline at end of file
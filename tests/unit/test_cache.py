@@ -0,0 +1,196 @@
+"""Unit tests for the SQLite-backed signature cache."""
+
+import atexit
+import json
+import sqlite3
+
+import pytest
+
+from dspy_core.cache import SignatureCache
+
+
+@pytest.fixture
+def make_cache():
+    """Build caches that are closed (flush thread stopped, database released) after the test"""
+    caches = []
+
+    def make(*args, **kwargs):
+        cache = SignatureCache(*args, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def _legacy_entry(question, answer):
+    """Entry as written by the old whole-file JSON cache"""
+    return {
+        "key": "sha256-" + question,
+        "signature": "CodeAnalysis",
+        "inputs": {"question": question},
+        "outputs": {"answer": answer},
+        "model": "test/model",
+        "timestamp": 1700000000.0,
+        "success": True,
+        "execution_time": 0.5,
+        "hit_count": 3,
+    }
+
+
+def _write_legacy_cache(cache_dir, *entries):
+    legacy_file = cache_dir / "signature_cache.json"
+    legacy_file.write_text(json.dumps({entry["key"]: entry for entry in entries}))
+    return legacy_file
+
+
+class TestLegacyMigration:
+    """Importing the old JSON cache into SQLite."""
+
+    def test_legacy_entries_rekeyed_and_file_removed(self, tmp_path, make_cache):
+        """Migrated entries hit under the current key and the old file is deleted"""
+        legacy_file = _write_legacy_cache(tmp_path, _legacy_entry("what  is this?", "code"))
+
+        cache = make_cache(str(tmp_path))
+
+        assert not legacy_file.exists()
+        assert cache.get("CodeAnalysis", {"question": "what is this?"}, "test/model") == {"answer": "code"}
+        rows = sqlite3.connect(tmp_path / "signature_cache.db").execute("SELECT COUNT(*) FROM entries").fetchone()
+        assert rows[0] == 1
+
+    def test_legacy_file_kept_when_import_does_not_commit(self, tmp_path, monkeypatch, make_cache):
+        """The old file survives if its entries never reach the store"""
+        legacy_file = _write_legacy_cache(tmp_path, _legacy_entry("q", "a"))
+        monkeypatch.setattr(SignatureCache, "_db_execute", lambda self, *args, **kwargs: False)
+
+        make_cache(str(tmp_path))
+
+        assert legacy_file.exists()
+
+
+class TestCacheKeys:
+    """Key memoization between get() and put()."""
+
+    def test_mutated_inputs_rekeyed(self, tmp_path, make_cache):
+        """Changing the inputs between a missed get() and put() stores under the new content"""
+        cache = make_cache(str(tmp_path))
+        inputs = {"question": "first"}
+        assert cache.get("CodeAnalysis", inputs, "test/model") is None
+
+        inputs["question"] = "second"
+        cache.put("CodeAnalysis", inputs, {"answer": "two"}, "test/model", 0.1)
+
+        assert cache.get("CodeAnalysis", {"question": "first"}, "test/model") is None
+        assert cache.get("CodeAnalysis", {"question": "second"}, "test/model") == {"answer": "two"}
+
+    def test_memo_released_after_round_trip(self, tmp_path, make_cache):
+        """Caller inputs are not retained once put() or a hit completes"""
+        cache = make_cache(str(tmp_path))
+        inputs = {"question": "q"}
+        cache.get("CodeAnalysis", inputs, "test/model")
+        assert cache._key_memo.entry[0] is inputs
+
+        cache.put("CodeAnalysis", inputs, {"answer": "a"}, "test/model", 0.1)
+        assert cache._key_memo.entry is None
+        cache.get("CodeAnalysis", inputs, "test/model")
+        assert cache._key_memo.entry is None
+
+    def test_whitespace_normalized(self, tmp_path, make_cache):
+        """Inputs differing only in whitespace share an entry"""
+        cache = make_cache(str(tmp_path))
+        cache.put("CodeAnalysis", {"question": "a  b\n"}, {"answer": "x"}, "test/model", 0.1)
+
+        assert cache.get("CodeAnalysis", {"question": " a b"}, "test/model") == {"answer": "x"}
+
+
+class TestEviction:
+    """Trimming the cache once it exceeds max_entries."""
+
+    def test_eviction_keeps_most_used_80_percent(self, tmp_path, make_cache):
+        """Overflow evicts down to 80% of max_entries, least-hit entries first"""
+        cache = make_cache(str(tmp_path), max_entries=10)
+        for i in range(10):
+            cache.put("CodeAnalysis", {"question": f"q{i}"}, {"answer": i}, "test/model", 0.1)
+        for i in range(5, 10):
+            cache.get("CodeAnalysis", {"question": f"q{i}"}, "test/model")
+
+        cache.put("CodeAnalysis", {"question": "q10"}, {"answer": 10}, "test/model", 0.1)
+
+        assert len(cache.memory_cache) == 8
+        assert cache.stats["cache_size"] == 8
+        for i in range(5, 10):
+            assert cache.get("CodeAnalysis", {"question": f"q{i}"}, "test/model") == {"answer": i}
+
+    def test_evicted_rows_deleted_from_store(self, tmp_path, make_cache):
+        """Evicted entries do not come back on reload"""
+        cache = make_cache(str(tmp_path), max_entries=5)
+        for i in range(6):
+            cache.put("CodeAnalysis", {"question": f"q{i}"}, {"answer": i}, "test/model", 0.1)
+        cache.save_all()
+
+        reloaded = make_cache(str(tmp_path), max_entries=5)
+
+        assert set(reloaded.memory_cache) == set(cache.memory_cache)
+
+
+class TestPersistence:
+    """Round-tripping entries through the SQLite store."""
+
+    def test_entries_survive_reload(self, tmp_path, make_cache):
+        """Entries and hit counts written before save_all are loaded by a new instance"""
+        cache = make_cache(str(tmp_path))
+        cache.put("CodeAnalysis", {"question": "q"}, {"answer": "a"}, "test/model", 0.25)
+        cache.get("CodeAnalysis", {"question": "q"}, "test/model")
+        cache.save_all()
+
+        reloaded = make_cache(str(tmp_path))
+
+        assert reloaded.get("CodeAnalysis", {"question": "q"}, "test/model") == {"answer": "a"}
+        (entry,) = reloaded.memory_cache.values()
+        assert entry.hit_count == 2
+        assert entry.execution_time == 0.25
+        assert reloaded.stats["cache_size"] == 1
+
+    def test_clear_empties_store(self, tmp_path, make_cache):
+        """A cleared cache reloads empty"""
+        cache = make_cache(str(tmp_path))
+        cache.put("CodeAnalysis", {"question": "q"}, {"answer": "a"}, "test/model", 0.1)
+        cache.save_all()
+        cache.clear()
+
+        assert make_cache(str(tmp_path)).memory_cache == {}
+
+
+class TestFlushing:
+    """Background writes and shutdown."""
+
+    def test_hits_update_only_the_hit_count(self, tmp_path, make_cache, monkeypatch):
+        """A hit on a stored entry is flushed as a narrow UPDATE, not a full row rewrite"""
+        cache = make_cache(str(tmp_path))
+        cache.put("CodeAnalysis", {"question": "q"}, {"answer": "a"}, "test/model", 0.1)
+        cache._flush_dirty()
+        statements = []
+        execute = SignatureCache._db_execute
+        monkeypatch.setattr(SignatureCache, "_db_execute",
+                            lambda self, sql, *args, **kwargs: statements.append(sql) or execute(self, sql, *args, **kwargs))
+
+        cache.get("CodeAnalysis", {"question": "q"}, "test/model")
+        cache._flush_dirty()
+
+        assert statements == ["UPDATE entries SET hits = ? WHERE key = ?"]
+        row = sqlite3.connect(tmp_path / "signature_cache.db").execute("SELECT hits FROM entries").fetchone()
+        assert row[0] == 1
+
+    def test_close_stops_flush_thread_and_saves(self, tmp_path, make_cache, monkeypatch):
+        """close() ends the flush thread, persists pending entries and drops the exit hook"""
+        unregistered = []
+        monkeypatch.setattr(atexit, "unregister", unregistered.append)
+        cache = make_cache(str(tmp_path))
+        cache.put("CodeAnalysis", {"question": "q"}, {"answer": "a"}, "test/model", 0.1)
+
+        cache.close()
+
+        assert not cache._flush_thread.is_alive()
+        assert unregistered == [cache.save_all]
+        assert make_cache(str(tmp_path)).get("CodeAnalysis", {"question": "q"}, "test/model") == {"answer": "a"}
@@ -0,0 +1,19 @@
+"""Unit tests for the shared CLI helpers."""
+
+from dspy_core.cli_utils import read_input
+
+
+class TestReadInput:
+    """Reading CLI input from a file or the argument itself."""
+
+    def test_file_line_endings_normalized(self, tmp_path):
+        """CRLF and lone CR become newlines, as with a text-mode read"""
+        path = tmp_path / "input.py"
+        path.write_bytes(b"def f():\r\n    return 1\rx = 2\n")
+
+        assert read_input(str(path)) == "def f():\n    return 1\nx = 2\n"
+
+    def test_non_path_used_as_input(self, tmp_path):
+        """An argument that is not a readable file is returned unchanged"""
+        assert read_input("fix the off-by-one\r\n") == "fix the off-by-one\r\n"
+        assert read_input(str(tmp_path)) == str(tmp_path)
@@ -0,0 +1,151 @@
+"""Unit tests for local pattern storage in community learning."""
+
+import hashlib
+import json
+
+import pytest
+
+from dspy_core.community import CommunityPatternLearning
+
+
+@pytest.fixture(autouse=True)
+def atlas_home(tmp_path, monkeypatch):
+    """Keep the anonymization salt out of the real ~/.atlas"""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+
+
+def _record(learner, question, quality=0.9):
+    learner.record_successful_interaction(
+        "CodeAnalysis", "analysis", {"question": question}, {"answer": "ok"}, {"quality_score": quality}
+    )
+    learner._flush_pending()
+
+
+def _log_lines(learner):
+    return learner.local_patterns_file.read_text().splitlines()
+
+
+class TestPatternLog:
+    """Replaying the append-only local pattern log."""
+
+    def test_patterns_replay_across_reload(self, tmp_path):
+        """A new instance rebuilds patterns, usage counts and averaged metrics from the log"""
+        cache_dir = tmp_path / "cache"
+        learner = CommunityPatternLearning(str(cache_dir))
+        _record(learner, "a", quality=1.0)
+        _record(learner, "a", quality=0.5)
+        _record(learner, "b")
+
+        reloaded = CommunityPatternLearning(str(cache_dir))
+
+        assert len(_log_lines(learner)) == 3
+        assert reloaded.local_patterns.keys() == learner.local_patterns.keys()
+        usage = sorted(p.usage_count for p in reloaded.local_patterns.values())
+        assert usage == [1, 2]
+        repeated = max(reloaded.local_patterns.values(), key=lambda p: p.usage_count)
+        assert repeated.success_metrics["quality_score"] == pytest.approx(0.75)
+        assert len(reloaded._by_signature["CodeAnalysis"]) == 2
+
+    def test_torn_last_line_is_skipped(self, tmp_path):
+        """A write cut off mid-line loses only that record"""
+        cache_dir = tmp_path / "cache"
+        learner = CommunityPatternLearning(str(cache_dir))
+        _record(learner, "a")
+        _record(learner, "b")
+        with open(learner.local_patterns_file, "a") as f:
+            f.write('{"pattern_id": "trunc')
+
+        reloaded = CommunityPatternLearning(str(cache_dir))
+
+        assert reloaded.local_patterns.keys() == learner.local_patterns.keys()
+
+    def test_compaction_keeps_one_line_per_pattern(self, tmp_path):
+        """Compaction rewrites the log to the current state of each pattern"""
+        cache_dir = tmp_path / "cache"
+        learner = CommunityPatternLearning(str(cache_dir))
+        learner.compact_every = 4
+        for _ in range(3):
+            _record(learner, "a")
+        assert len(_log_lines(learner)) == 3
+
+        _record(learner, "b")
+
+        assert len(_log_lines(learner)) == 2
+        assert learner._appends_since_compact == 0
+        reloaded = CommunityPatternLearning(str(cache_dir))
+        assert sorted(p.usage_count for p in reloaded.local_patterns.values()) == [1, 3]
+
+
+class TestLegacyMigration:
+    """Importing the old whole-file local_patterns.json."""
+
+    def test_legacy_json_moves_into_log(self, tmp_path):
+        """Legacy patterns (ISO timestamps) load and the old file is removed"""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        legacy_file = cache_dir / "local_patterns.json"
+        legacy_file.write_text(json.dumps({
+            "0123456789abcdef": {
+                "pattern_id": "0123456789abcdef",
+                "signature_type": "CodeAnalysis",
+                "context_type": "analysis",
+                "input_pattern": "anonymized_10_" + "0" * 32,
+                "output_pattern": "anonymized_12_" + "1" * 32,
+                "success_metrics": {"quality_score": 0.8},
+                "usage_count": 4,
+                "created_at": "2025-01-01T12:00:00",
+                "last_used": "2025-01-02T12:00:00",
+            }
+        }))
+
+        learner = CommunityPatternLearning(str(cache_dir))
+
+        assert not legacy_file.exists()
+        (pattern,) = learner.local_patterns.values()
+        assert pattern.pattern_id == "legacy_0123456789abcdef"
+        assert pattern.usage_count == 4
+        assert isinstance(pattern.created_at, int)
+        assert learner.get_pattern_statistics()["local_patterns"]["total"] == 1
+        assert len(_log_lines(learner)) == 1
+
+    def test_recurring_legacy_pattern_is_rekeyed(self, tmp_path):
+        """A repeat of an interaction stored under the SHA-256 scheme continues its pattern"""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        salt = "0011223344556677"
+        (cache_dir / "anonymization_salt").write_text(salt)
+
+        def legacy_anonymized(content):
+            content_str = json.dumps(content, sort_keys=True)
+            digest = hashlib.sha256((content_str + salt).encode()).hexdigest()[:32]
+            return f"anonymized_{len(content_str)}_{digest}"
+
+        input_pattern = legacy_anonymized({"question": "a"})
+        output_pattern = legacy_anonymized({"answer": "ok"})
+        legacy_id = hashlib.sha256(
+            f"CodeAnalysis_analysis_{input_pattern}_{output_pattern}".encode()
+        ).hexdigest()[:16]
+        (cache_dir / "local_patterns.json").write_text(json.dumps({
+            legacy_id: {
+                "pattern_id": legacy_id,
+                "signature_type": "CodeAnalysis",
+                "context_type": "analysis",
+                "input_pattern": input_pattern,
+                "output_pattern": output_pattern,
+                "success_metrics": {"quality_score": 0.9},
+                "usage_count": 4,
+                "created_at": "2025-01-01T12:00:00",
+                "last_used": "2025-01-02T12:00:00",
+            }
+        }))
+
+        learner = CommunityPatternLearning(str(cache_dir))
+        _record(learner, "a")
+
+        (pattern,) = learner.local_patterns.values()
+        assert not pattern.pattern_id.startswith("legacy_")
+        assert pattern.usage_count == 5
+        assert learner._legacy_count == 0
+        reloaded = CommunityPatternLearning(str(cache_dir))
+        assert list(reloaded.local_patterns) == [pattern.pattern_id]
+        assert reloaded.local_patterns[pattern.pattern_id].usage_count == 5
@@ -0,0 +1,111 @@
+"""Unit tests for the model performance log in HybridModelStrategy."""
+
+import json
+
+import pytest
+
+from dspy_core.model_strategy import HybridModelStrategy
+
+
+@pytest.fixture
+def strategy_dir(tmp_path, monkeypatch):
+    """Run in a scratch directory (the log lives under ./dspy_cache) with Ollama unreachable"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(HybridModelStrategy, "_is_ollama_available", lambda self: False)
+    return tmp_path / "dspy_cache"
+
+
+def _record(strategy, model="ollama/llama3.2", task="code", success=True, quality=0.8):
+    strategy.record_performance(model, task, success, quality, execution_time=1.0, cost=0.01)
+
+
+def _log_lines(strategy):
+    return strategy.performance_log.read_text().splitlines()
+
+
+class TestPerformanceLog:
+    """Replaying the append-only performance log."""
+
+    def test_totals_replay_across_reload(self, strategy_dir):
+        """Flushed observations fold back into the same totals"""
+        strategy = HybridModelStrategy()
+        _record(strategy, quality=1.0)
+        _record(strategy, success=False, quality=0.5)
+        _record(strategy, task="analysis")
+        strategy.flush_performance_cache()
+
+        reloaded = HybridModelStrategy()
+
+        stats = reloaded.performance_cache["ollama/llama3.2"]["code"]
+        assert stats["total_runs"] == 2
+        assert stats["success_rate"] == 0.5
+        assert stats["avg_quality"] == pytest.approx(0.75)
+        assert reloaded.performance_cache["ollama/llama3.2"]["analysis"]["total_runs"] == 1
+
+    def test_duplicate_ids_counted_once(self, strategy_dir):
+        """A line appended twice (e.g. a retried write) is only folded once"""
+        strategy = HybridModelStrategy()
+        _record(strategy)
+        strategy.flush_performance_cache()
+        (line,) = _log_lines(strategy)
+        with open(strategy.performance_log, "a") as f:
+            f.write(line + "\n")
+
+        reloaded = HybridModelStrategy()
+
+        assert reloaded.performance_cache["ollama/llama3.2"]["code"]["total_runs"] == 1
+
+    def test_torn_line_is_skipped(self, strategy_dir):
+        """A write cut off mid-line does not discard the rest of the log"""
+        strategy = HybridModelStrategy()
+        _record(strategy)
+        strategy.flush_performance_cache()
+        with open(strategy.performance_log, "a") as f:
+            f.write('{"model":"ollama/llama3.2","task_ty')
+
+        reloaded = HybridModelStrategy()
+
+        assert reloaded.performance_cache["ollama/llama3.2"]["code"]["total_runs"] == 1
+
+    def test_compaction_after_ten_lines_per_entry(self, strategy_dir):
+        """More than 10 lines per (model, task) entry rewrites the log as totals"""
+        strategy = HybridModelStrategy()
+        for _ in range(10):
+            _record(strategy)
+        strategy.flush_performance_cache()
+        assert len(_log_lines(strategy)) == 10
+
+        _record(strategy)
+        strategy.flush_performance_cache()
+
+        (line,) = _log_lines(strategy)
+        assert json.loads(line)["total_runs"] == 11
+        reloaded = HybridModelStrategy()
+        assert reloaded.performance_cache["ollama/llama3.2"]["code"]["total_runs"] == 11
+
+
+class TestLegacyMigration:
+    """Importing the old whole-file model_performance.json."""
+
+    def test_legacy_totals_migrate_once(self, strategy_dir):
+        """Legacy totals move into the log, and a re-run migration is not double counted"""
+        strategy_dir.mkdir()
+        legacy = {"ollama/llama3.2": {"code": {
+            "total_runs": 4, "successful_runs": 3, "total_quality": 3.2,
+            "total_time": 8.0, "total_cost": 0.0, "success_rate": 0.75,
+        }}}
+        legacy_file = strategy_dir / "model_performance.json"
+        legacy_file.write_text(json.dumps(legacy))
+
+        strategy = HybridModelStrategy()
+
+        assert not legacy_file.exists()
+        stats = strategy.performance_cache["ollama/llama3.2"]["code"]
+        assert stats["total_runs"] == 4
+        assert stats["avg_quality"] == pytest.approx(0.8)
+
+        # Crash between the append and the unlink: the old file is migrated again
+        legacy_file.write_text(json.dumps(legacy))
+        reloaded = HybridModelStrategy()
+
+        assert reloaded.performance_cache["ollama/llama3.2"]["code"]["total_runs"] == 4
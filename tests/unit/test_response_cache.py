@@ -0,0 +1,94 @@
+"""Unit tests for the v6 CLI persistent response cache."""
+
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("dspy")
+
+import atlas_dspy_v6 as cli
+
+
+@pytest.fixture(autouse=True)
+def response_cache(tmp_path, monkeypatch):
+    """Point ~/.atlas at a scratch directory and open a fresh cache connection"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(cli, "_response_cache", None)
+
+
+def _args(*argv):
+    return cli.setup_cli().parse_args(list(argv))
+
+
+class TestResponseCacheKey:
+    """Keys cover everything that changes the workflow result."""
+
+    def test_same_request_same_key(self):
+        args = _args("analyze", "code", "--level", "quick")
+        assert cli.response_cache_key("analyze", args, "x = 1") == cli.response_cache_key("analyze", args, "x = 1")
+
+    @pytest.mark.parametrize("argv", [
+        ("analyze", "code", "--level", "premium"),
+        ("analyze", "code", "--model-strategy", "local-only"),
+        ("analyze", "code", "--max-cost", "0.5"),
+        ("analyze", "code", "security review"),
+        ("analyze", "code", "--model", "ollama/llama3.2"),
+    ])
+    def test_settings_change_key(self, argv):
+        base = cli.response_cache_key("analyze", _args("analyze", "code"), "x = 1")
+        assert cli.response_cache_key("analyze", _args(*argv), "x = 1") != base
+
+    def test_input_and_command_change_key(self):
+        args = _args("analyze", "code")
+        base = cli.response_cache_key("analyze", args, "x = 1")
+        assert cli.response_cache_key("analyze", args, "x = 2") != base
+        assert cli.response_cache_key("refactor", args, "x = 1") != base
+
+
+class TestResponseCacheStore:
+    """Round-tripping results through the SQLite store."""
+
+    def test_round_trip(self):
+        cli.store_cached_response("k", {"success": True, "value": 1})
+        assert cli.load_cached_response("k") == {"success": True, "value": 1}
+        assert cli.load_cached_response("missing") is None
+
+    def test_expired_entries_miss(self, monkeypatch):
+        cli.store_cached_response("k", {"success": True})
+        now = cli.time.time()
+        monkeypatch.setattr(cli.time, "time", lambda: now + cli.RESPONSE_CACHE_TTL + 1)
+        assert cli.load_cached_response("k") is None
+
+    def test_only_newest_entries_kept(self, monkeypatch):
+        monkeypatch.setattr(cli, "RESPONSE_CACHE_MAX_ENTRIES", 2)
+        for i in range(3):
+            cli.store_cached_response(f"k{i}", {"success": True, "i": i})
+        assert cli.load_cached_response("k0") is None
+        assert cli.load_cached_response("k2") == {"success": True, "i": 2}
+
+
+class TestMainCaching:
+    """How main() consults the cache for core commands."""
+
+    @pytest.fixture
+    def execute(self, monkeypatch):
+        execute = MagicMock(return_value={"success": True, "value": 1})
+        monkeypatch.setattr(cli, "execute_with_progressive_complexity", execute)
+        monkeypatch.setattr(cli, "get_engine", MagicMock())
+        return execute
+
+    def _run(self, monkeypatch, *argv):
+        monkeypatch.setattr(sys, "argv", ["atlas_dspy_v6.py", *argv, "--quiet"])
+        cli.main()
+
+    def test_repeat_request_served_from_cache(self, monkeypatch, execute):
+        self._run(monkeypatch, "analyze", "x = 1")
+        self._run(monkeypatch, "analyze", "x = 1")
+        assert execute.call_count == 1
+
+    def test_no_cache_bypasses_lookup_and_store(self, monkeypatch, execute):
+        self._run(monkeypatch, "analyze", "x = 1", "--no-cache")
+        self._run(monkeypatch, "analyze", "x = 1", "--no-cache")
+        self._run(monkeypatch, "analyze", "x = 1")
+        assert execute.call_count == 3